@@ -0,0 +1,6 @@
+"""
+Benchmarks for the game, run them from the root of the repo, for example:
+python -m benchmarks.lasers
+
+The suite, benchmarks.suite, runs stress scenarios and compares them to a baseline (python tools.py bench).
+"""
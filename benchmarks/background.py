@@ -0,0 +1,50 @@
+"""
+Cost of the backgrounds: time to update and draw them per frame, and the memory they hold.
+"""
+import sys
+
+import pygame
+
+from .common import setup_game, time_frames
+
+FRAMES = 1000
+
+
+def surface_size(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+def positions_size(positions):
+    if hasattr(positions, "nbytes"):  # a numpy array
+        return positions.nbytes
+    return sys.getsizeof(positions) + sum(sys.getsizeof(position) for position in positions)
+
+
+def main():
+    game = setup_game()
+
+    from space_invaders.background import ImageBackground, Starfield
+
+    image, starfield = ImageBackground(game), Starfield(game)
+    memory = {
+        image: surface_size(image.image),
+        starfield: sum(
+            surface_size(layer.star) + positions_size(layer.xs) + positions_size(layer.ys)
+            for layer in starfield.layers
+        )
+    }
+
+    print(f"Backgrounds at {game.screen_size}:")
+    for name, background in (("image", image), ("starfield", starfield)):
+        def frame():
+            background.update()
+            background.draw(game.screen)
+
+        timing = time_frames(frame, FRAMES)
+        print(f"{name:<10} {timing:6.3f} ms/frame {memory[background] / 1024:10.1f} KiB")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
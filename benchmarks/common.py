@@ -0,0 +1,72 @@
+import random
+import sys
+import time
+import tracemalloc
+
+import pygame
+
+
+def setup_game(new_game=True, **kwargs):
+    """
+    Creates a game without opening a window, with a new game already started unless new_game is False.
+    The kwargs are passed to Game.
+    """
+    from space_invaders import setup_headless
+    from space_invaders.game import Game
+
+    setup_headless()
+    pygame.init()
+
+    game = Game(**kwargs)
+    if new_game:
+        game.start_new_game()
+        game.ship.health = 10 ** 6  # we don't want to die in the middle of a benchmark
+    return game
+
+
+def populate(scene, count, ship_types=None, seed=0):
+    """
+    Adds count enemi ships at random positions to the scene.
+    """
+    from space_invaders.ships import EnemiShip, HeavyEnemiShip, RamShip
+
+    rng = random.Random(seed)
+    ship_types = ship_types or (EnemiShip, HeavyEnemiShip, RamShip)
+    for _ in range(count):
+        ship = scene.pool.acquire(rng.choice(ship_types), rng.randrange(scene.game.screen_width))
+        ship.place(y=rng.randrange(scene.game.screen_height // 2))
+        scene.enemi_ships.add(ship)
+
+
+def time_frames(func, frames):
+    """
+    Runs func once per frame, returns the mean time per frame in ms.
+    """
+    start = time.perf_counter()
+    for _ in range(frames):
+        func()
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def measure(func, count):
+    """
+    Runs func count times, returns the time (in µs) and
+    the allocated memory (in bytes) per call.
+    """
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(count):
+        func()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return elapsed / count * 1_000_000, (after - before) / count
+
+
+def report(name, timing, memory):
+    print(f"{name:<30} {timing:>10.2f} µs/call {memory:>10.1f} B/call", file=sys.stdout)
@@ -0,0 +1,42 @@
+"""
+Per-shot cost of creating a laser, with and without the team laser cache and the sprite pool.
+"""
+from itertools import count
+
+from .common import measure, report, setup_game
+
+SHOTS = 5000
+
+
+def main():
+    game = setup_game()
+    scene = game.scene
+
+    from space_invaders.lasers import AutoLaser
+    from space_invaders.lasers.base import get_enemi_laser, get_friendly_laser
+
+    pos = game.screen_rect.center
+    lasers = []  # keep the lasers alive, like the scene's group does
+    shots = count()  # every other shot is an enemi one
+
+    def uncached():
+        factory = get_enemi_laser if next(shots) % 2 else get_friendly_laser
+        lasers.append(factory(AutoLaser)(game, scene, pos))
+
+    def cached():
+        lasers.append(AutoLaser.create(game, scene, pos, bool(next(shots) % 2)))
+
+    def pooled():
+        laser = AutoLaser.create(game, scene, pos, bool(next(shots) % 2))
+        scene.lasers.add(laser)
+        laser.kill()  # goes back to the pool, ready for the next shot
+
+    print(f"Creating {SHOTS} lasers:")
+    for name, func in (("new class per shot (before)", uncached), ("cached team class (after)", cached),
+                       ("cached and pooled", pooled)):
+        lasers.clear()
+        report(name, *measure(func, SHOTS))
+
+
+if __name__ == "__main__":
+    main()
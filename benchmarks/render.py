@@ -0,0 +1,43 @@
+"""
+Rendering cost of MainScene per frame, flipping the whole screen or only updating the dirty rects.
+Note that with SDL's dummy video driver, the cost of updating the window itself isn't measured.
+"""
+import pygame
+
+from .common import populate, setup_game, time_frames
+
+FRAMES = 300
+SHIP_COUNTS = (0, 10, 50, 200)
+
+
+def main():
+    results = {}
+    for dirty_rects in (False, True):
+        game = setup_game(dirty_rects=dirty_rects)
+        scene = game.scene
+        scene.scheduler.clear()  # no spawns, we control the load
+
+        for count in SHIP_COUNTS:
+            scene.enemi_ships.empty()
+            populate(scene, count)
+            scene.invalidate()
+
+            def frame():
+                game.step()
+                scene.clear_screen()
+                scene.draw()
+                scene.update_screen()
+
+            logic = time_frames(game.step, FRAMES)
+            results[dirty_rects, count] = time_frames(frame, FRAMES) - logic
+
+        pygame.quit()
+
+    print(f"Render time per frame at {game.screen_size}:")
+    for count in SHIP_COUNTS:
+        full, dirty = results[False, count], results[True, count]
+        print(f"{count:>5} ships: full flip {full:6.3f} ms, dirty rects {dirty:6.3f} ms ({full / dirty:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
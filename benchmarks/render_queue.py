@@ -0,0 +1,50 @@
+"""
+Time to draw the sprites of MainScene per frame, group by group (before) or through the render queue (after).
+Half of the ships are above the screen, like the ships that are spawning, the queue culls them.
+"""
+import pygame
+
+from .common import populate, setup_game, time_frames
+
+FRAMES = 300
+SHIP_COUNTS = (1000, 2000, 4000)
+
+
+def main():
+    game = setup_game()
+    scene = game.scene
+    scene.scheduler.clear()  # no spawns, we control the load
+    screen = game.screen
+
+    from space_invaders.text import get_text
+
+    def before():
+        for group in (scene.player, *scene.objects):
+            group.draw(screen, game.alpha)
+
+        bg = scene._get_status_box(game.score, game.ship.health)
+        screen.blit(bg, (game.screen_width - bg.get_width(), game.screen_height - bg.get_height()))
+        screen.blit(get_text(f"FPS: {round(game.clock.get_fps())}", game.font_size / 2), (0, 0))
+
+    print(f"Sprite drawing time per frame at {game.screen_size}:")
+    for count in SHIP_COUNTS:
+        scene.enemi_ships.empty()
+        populate(scene, count)
+        for i, ship in enumerate(scene.enemi_ships):
+            if i % 2:
+                ship.place(bottom=0)
+        scene.player.save_positions()
+        for group in scene.objects:
+            group.save_positions()
+        game.alpha = 0.5
+
+        group_by_group = time_frames(before, FRAMES)
+        queued = time_frames(scene.draw, FRAMES)
+        print(f"{count:>5} ships: group by group {group_by_group:6.3f} ms, "
+              f"render queue {queued:6.3f} ms ({group_by_group / queued:.2f}x)")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
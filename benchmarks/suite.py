@@ -0,0 +1,221 @@
+"""
+The benchmark suite: stress scenarios whose update, collision and draw times and allocations per frame
+are compared to a baseline. Run it with `python tools.py bench`, see --help for the options.
+The baseline depends on the machine, save one with --save before making changes.
+"""
+import argparse
+import json
+import pathlib
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+
+import pygame
+
+from .common import populate, setup_game
+
+BASELINE_PATH = pathlib.Path(__file__).parent / "baseline.json"
+THRESHOLD = 0.25  # relative regression that fails the suite, the timings easily vary by 10-20%
+
+WARMUP_FRAMES = 30
+FRAMES = 200
+ALLOC_FRAMES = 50  # tracemalloc slows everything down, so they are separate
+
+# metric -> (unit, smallest difference that counts as a regression, to ignore the noise)
+METRICS = {
+    "update": ("ms", 0.05),
+    "collision": ("ms", 0.05),
+    "draw": ("ms", 0.05),
+    "alloc": ("KiB", 1),
+}
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    """
+    Registers a scenario, a function setting up a game and returning it,
+    with a function called before every frame (outside of the measures) or None.
+    """
+    def decorator(func):
+        SCENARIOS[name] = func
+        return func
+    return decorator
+
+
+def _quiet(game):
+    game.scene.scheduler.clear()  # no spawns, the scenario controls the load
+
+
+for count in (100, 500, 2000):
+    @scenario(f"ships-{count}")
+    def _ships(count=count):
+        game = setup_game()
+        _quiet(game)
+        populate(game.scene, count)
+        return game, None
+
+
+@scenario("laser-storm")
+def _laser_storm():
+    from space_invaders.lasers import BasicLaser
+
+    game = setup_game()
+    _quiet(game)
+    scene = game.scene
+    populate(scene, 100)
+
+    bottom = game.screen_height - 1
+    xs = range(0, game.screen_width, game.screen_width // 30)
+
+    def before_frame():
+        for x in xs:
+            scene.lasers.add(BasicLaser.create(game, scene, (x, bottom), False))
+
+    return game, before_frame
+
+
+@scenario("menu-welcome")
+def _welcome():
+    return setup_game(new_game=False), None
+
+
+@scenario("menu-pause")
+def _pause():
+    game = setup_game()
+    _quiet(game)
+    populate(game.scene, 100)
+    game.pause_game()
+    return game, None
+
+
+def _timed(func, timings, name):
+    def wrapper(*args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            timings[name] += time.perf_counter() - start
+    return wrapper
+
+
+def run_scenario(name):
+    """
+    Returns the median update, collision (included in the update) and draw times per frame,
+    in ms, and the mean peak of the memory allocated during a frame, in KiB.
+    """
+    game, before_frame = SCENARIOS[name]()
+    scene = game.scene
+
+    timings = Counter()
+    if hasattr(scene, "enemi_grid"):  # time the collisions separately
+        scene.enemi_grid.collide = _timed(scene.enemi_grid.collide, timings, "collision")
+        scene.collide_ship = _timed(scene.collide_ship, timings, "collision")
+
+    def frame():
+        if before_frame:
+            before_frame()
+
+        start = time.perf_counter()
+        game.step()
+        timings["update"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        scene.clear_screen()
+        scene.draw()
+        scene.update_screen()
+        timings["draw"] += time.perf_counter() - start
+
+    for _ in range(WARMUP_FRAMES):
+        frame()
+
+    frames = defaultdict(list)  # the medians are less noisy than the means
+    for _ in range(FRAMES):
+        timings.clear()
+        frame()
+        for metric in ("update", "collision", "draw"):
+            frames[metric].append(timings[metric] * 1000)
+    results = {metric: statistics.median(times) for metric, times in frames.items()}
+
+    tracemalloc.start()
+    peaks = 0
+    for _ in range(ALLOC_FRAMES):
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        frame()
+        peaks += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+    results["alloc"] = peaks / ALLOC_FRAMES / 1024
+
+    game.close()
+    pygame.quit()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the results next to the baseline, returns the regressions.
+    """
+    regressions = []
+    print(f"{'scenario':<15}" + "".join(f"{f'{metric} ({unit})':>24}" for metric, (unit, _) in METRICS.items()))
+    for name, metrics in results.items():
+        line = f"{name:<15}"
+        for metric, (_, noise) in METRICS.items():
+            value = metrics[metric]
+            base = baseline.get(name, {}).get(metric)
+            if base is None:
+                line += f"{value:>24.3f}"
+                continue
+
+            change = (value - base) / base if base else 0
+            line += f"{value:>12.3f} ({change:>+7.1%})  "
+            if value - base > noise and change > threshold:
+                regressions.append((name, metric, base, value))
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser("bench", description=__doc__)
+    parser.add_argument("scenarios", nargs="*",
+                        help=f"The scenarios to run, all of them by default: {', '.join(SCENARIOS)}.")
+    parser.add_argument("--save", action="store_true", help="Save the results as the baseline.")
+    parser.add_argument("--baseline", type=pathlib.Path, default=BASELINE_PATH, help="The baseline file.")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="Relative slowdown that counts as a regression.")
+    args = parser.parse_args()
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name}")
+
+    results = {name: run_scenario(name) for name in args.scenarios or SCENARIOS}
+
+    from space_invaders.constants import SCREEN_SIZE
+
+    try:
+        baseline = json.loads(args.baseline.read_text())
+    except FileNotFoundError:
+        baseline = {}
+    if baseline and baseline["screen_size"] != list(SCREEN_SIZE):
+        print(f"The baseline was saved at the screen size {baseline['screen_size']}, the results will differ")
+    regressions = compare(results, baseline.get("results", {}), args.threshold)
+
+    if args.save:
+        baseline["screen_size"] = SCREEN_SIZE
+        baseline.setdefault("results", {}).update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=4))
+        print(f"Saved the baseline to {args.baseline}")
+        return
+
+    if not baseline:
+        print("No baseline to compare to, save one with --save")
+    for name, metric, base, value in regressions:
+        print(f"REGRESSION: {name} {metric} went from {base:.3f} to {value:.3f}", file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,13 @@ from contextlib import contextmanager
 
 import pygame
 
-from .constants import DIR, WINDOW_TITLE
+from .background import BACKGROUNDS
+from .constants import (BACKGROUND, DIR, HEADLESS_FRAMES, PACING,
+                        PACING_MODES, RENDER_MODE, RENDER_MODES, TICK_RATE,
+                        WINDOW_TITLE)
 from .game import Game, Stop
+from .replay import ReplayError
+from .waves import WaveError
 
 log = logging.getLogger(__name__)
 
@@ -39,6 +44,19 @@ def setup_log():  # FIXME
                 log_.removeHandler(hnd)
 
 
+def parse_seed(value):
+    """
+    Seeds are saved in the replays as 32 bits unsigned integers.
+    """
+    try:
+        seed = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value!r} isn't an integer") from None
+    if not 0 <= seed < 2 ** 32:
+        raise argparse.ArgumentTypeError(f"{seed} isn't between 0 and {2 ** 32 - 1}")
+    return seed
+
+
 def parse_args():
     parser = argparse.ArgumentParser(
         WINDOW_TITLE,
@@ -50,7 +68,99 @@ def parse_args():
         action="store_true",
         default=False
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--headless",
+        help="Run the game logic without a display, as fast as possible, and report the speed.",
+        action="store_true",
+        default=False
+    )
+    parser.add_argument(
+        "--frames",
+        help="Number of frames to simulate in headless mode.",
+        type=int,
+        default=HEADLESS_FRAMES
+    )
+    parser.add_argument(
+        "--dirty-rects",
+        help="Only update the parts of the screen that changed during gameplay, instead of flipping it.",
+        action="store_true",
+        default=False
+    )
+    parser.add_argument(
+        "--background",
+        help="The background of the game.",
+        choices=BACKGROUNDS,
+        default=BACKGROUND
+    )
+    parser.add_argument(
+        "--render",
+        help="How the game is drawn: native at the window size, or small and scaled to the window, "
+             "by SDL or by a whole factor (integer).",
+        choices=RENDER_MODES,
+        default=RENDER_MODE
+    )
+    parser.add_argument(
+        "--pacing",
+        help="How to wait for the next frame, the frame intervals and the key press to display latency are logged "
+             "when quitting. vsync needs --render scaled.",
+        choices=PACING_MODES,
+        default=PACING
+    )
+    parser.add_argument(
+        "--tick-rate",
+        help="Number of game logic updates per second.",
+        type=int,
+        default=TICK_RATE
+    )
+    parser.add_argument(
+        "--profile-frames",
+        help="Write the time spent in each phase of every frame to this JSON lines file (F3 shows them in game).",
+        metavar="PATH",
+        default=None
+    )
+    parser.add_argument(
+        "--seed",
+        help="Seed of the game's randomness, the same seed and inputs give the same game.",
+        type=parse_seed,
+        default=None
+    )
+    parser.add_argument(
+        "--record",
+        help="Record the inputs to this file, to replay the game later.",
+        metavar="PATH",
+        default=None
+    )
+    parser.add_argument(
+        "--replay",
+        help="Replay a recorded game, with --headless it is simulated as fast as possible.",
+        metavar="PATH",
+        default=None
+    )
+    args = parser.parse_args()
+    if args.record and (args.headless or args.replay):
+        parser.error("--record can't be used with --headless or --replay")
+    return args
+
+
+def setup_headless():
+    """
+    Makes SDL use its dummy drivers, needs to be called before pygame.init.
+    """
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+
+def run_headless(frames=HEADLESS_FRAMES, tick_rate=TICK_RATE, seed=None, replay_path=None, render_mode=RENDER_MODE):
+    """
+    Runs the game logic without a display, see Game.run_headless and Game.run_replay.
+    """
+    setup_headless()
+    pygame.init()
+
+    game = Game(tick_rate, seed=seed, replay_path=replay_path, render_mode=render_mode)
+    if replay_path:
+        return game.run_replay()
+    return game.run_headless(frames)
 
 
 def main():
@@ -60,16 +170,27 @@ def main():
     with setup_log():
         args = parse_args()
 
+        if args.headless:
+            setup_headless()
         os.environ["SDL_VIDEO_CENTERED"] = "1"  # place the game window at the center of the screen
         status = pygame.init()
         log.info(f"Pygame init status {status}")
         log.info(f"SDL version: {(pygame.get_sdl_version())}")
 
         try:
-            game = Game()
-            game.mainloop()
+            if args.headless:
+                frames, fps = run_headless(args.frames, args.tick_rate, args.seed, args.replay, args.render)
+                log.info(f"Simulated {frames} frames at {fps:.0f} frames per second")
+            else:
+                game = Game(
+                    args.tick_rate, args.dirty_rects, args.background, args.profile_frames,
+                    args.seed, args.record, args.replay, args.render, args.pacing
+                )
+                game.mainloop()
         except Stop:
             pass
+        except (ReplayError, WaveError) as e:
+            log.error(e)
         except Exception:
             log.exception("An exception occured:")
 
@@ -1,36 +1,168 @@
+import json
 import logging
+import mmap
+import os
+import struct
 from collections import defaultdict
 from functools import partial
 
 import pygame
 
-from .constants import ASSETS_DIR, BASE_SCREEN_SIZE
+from .constants import (ASSETS_DIR, ATLAS_MAX_HEIGHT, ATLAS_WIDTH,
+                        BASE_SCREEN_SIZE, CACHE_DIR, PYINSTALLER)
+from .filters import apply_filter, rotated_name
 
 log = logging.getLogger(__name__)
 
-_cache = {}
-
-
-def nested_dict():
-    return defaultdict(nested_dict)
+ERROR_SPRITE = ("error",)
 
+# the atlas file: magic, header size, header (json) and then the pixels of the pages
+ATLAS_SOURCE_DIR = ASSETS_DIR / "sprites"
+ATLAS_MAGIC = b"SIAT"
+ATLAS_HEADER = struct.Struct("<4sI")
+ATLAS_VERSION = 2  # bump when the format of the atlas changes
 
-def construct_dict_call(keys):
-    return "".join([f"['{key}']" for key in keys])
+_cache = {}
+_generation = 0  # bumped every time the assets are loaded
+_variants = defaultdict(set)  # sprite name -> variants (chains of filters) to derive, declared by the handles
 
 
 def load_assets(size):
+    global _generation
+
     if _cache:
         _cache.clear()
 
-    _cache["sprites"] = nested_dict()
+    # path parts (without the extension), followed by the filters for variants -> sprite, a subsurface of an atlas page
+    _cache["sprites"] = {}
+    _cache["names"] = {}  # sprite -> path parts
+    _cache["variants"] = {}  # variants of sprites that aren't in the atlas
+    _cache["masks"] = {}  # sprite -> collision mask
     _cache["fonts"] = defaultdict(dict)
 
     _load_sprites(size)
+    _load_masks()
+    _generation += 1
+
+    variants = set(_get_variant_names())
+    variants_size = sum(
+        sprite.get_width() * sprite.get_height() * sprite.get_bytesize()
+        for name, sprite in _cache["sprites"].items() if name in variants
+    )
+    log.info(f"The {len(variants)} precomputed sprite variants use {variants_size / 1024:.0f} KiB")
 
 
 def _load_sprites(size):
-    for asset in (ASSETS_DIR / "sprites").rglob("*"):
+    path = CACHE_DIR / f"sprites-{size[0]}x{size[1]}.atlas"
+    pixel_format = _get_pixel_format()
+
+    if _read_atlas(path, size, pixel_format):
+        return
+
+    _build_atlas(size)
+    _write_atlas(path, size, pixel_format)
+
+
+def _get_pixel_format():
+    # store the pixels like convert_alpha would, so that the cached sprites are as fast to blit
+    masks = pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha().get_masks()
+    return "BGRA" if masks == (0xff0000, 0xff00, 0xff, 0xff000000) else "RGBA"
+
+
+def _get_sources():
+    """
+    Returns the modification times of the sprite folders and the size
+    and modification time of the sprite files, to tell if the atlas is up to date.
+    """
+    sources = {}
+    dirs = {}
+    for path in sorted(ATLAS_SOURCE_DIR.rglob("*")):
+        stat = path.stat()
+        name = path.relative_to(ATLAS_SOURCE_DIR).as_posix()
+        if path.is_dir():
+            dirs[name] = stat.st_mtime_ns
+        else:
+            sources[name] = [stat.st_mtime_ns, stat.st_size]
+    dirs["."] = ATLAS_SOURCE_DIR.stat().st_mtime_ns  # files added or removed at the root
+
+    return sources, dirs
+
+
+def _get_variant_names():
+    return sorted(name + variant for name, variants in _variants.items() for variant in variants)
+
+
+def _is_up_to_date(header, size, pixel_format):
+    if header["version"] != ATLAS_VERSION or header["size"] != list(size) or header["format"] != pixel_format:
+        return False
+    if header["variants"] != [list(name) for name in _get_variant_names()]:
+        return False
+    if PYINSTALLER:  # the assets can't change
+        return True
+
+    # only stat what we know about, folders change when files are added or removed from them
+    try:
+        for name, mtime in header["dirs"].items():
+            if (ATLAS_SOURCE_DIR / name).stat().st_mtime_ns != mtime:
+                return False
+        for name, (mtime, file_size) in header["sources"].items():
+            stat = (ATLAS_SOURCE_DIR / name).stat()
+            if stat.st_mtime_ns != mtime or stat.st_size != file_size:
+                return False
+    except OSError:
+        return False
+    return True
+
+
+def _pack(sizes):
+    """
+    Packs rectangles in pages using shelves, returns the size of the pages
+    and the page and rect of every rectangle.
+    """
+    width = max(ATLAS_WIDTH, *(w for w, _ in sizes.values()))
+    pages = []
+    positions = {}
+
+    x = y = shelf_height = 0
+    for name in sorted(sizes, key=lambda name: sizes[name][::-1], reverse=True):  # tallest first
+        w, h = sizes[name]
+        if x + w > width:  # new shelf
+            x, y, shelf_height = 0, y + shelf_height, 0
+        if y + h > ATLAS_MAX_HEIGHT and y:  # new page
+            pages.append((width, y))
+            x = y = shelf_height = 0
+
+        positions[name] = (len(pages), pygame.Rect(x, y, w, h))
+        x += w
+        shelf_height = max(shelf_height, h)
+    pages.append((width, y + shelf_height))
+
+    return pages, positions
+
+
+def _set_atlas(pages, positions):
+    _cache["atlas"] = pages
+    for name, (page, rect) in positions.items():
+        sprite = _cache["sprites"][name] = pages[page].subsurface(rect)
+        _cache["names"][sprite] = name
+
+
+def _derive_variants(sprites):
+    """
+    Adds the variants declared by the sprite handles to the sprites, they are derived from each other.
+    """
+    for name, variants in _variants.items():
+        if name not in sprites:
+            log.warning(f"Can't derive variants of missing sprite {'/'.join(name)}")
+            continue
+
+        for variant in sorted(variants, key=len):  # the shorter variants are the sources of the longer ones
+            sprites[name + variant] = apply_filter(sprites[name + variant[:-1]], variant[-1])
+
+
+def _build_atlas(size):
+    sprites = {}
+    for asset in ATLAS_SOURCE_DIR.rglob("*"):
         if asset.is_dir():
             continue
 
@@ -40,19 +172,178 @@ def _load_sprites(size):
                 round(sprite.get_width() * size[0] / BASE_SCREEN_SIZE[0]),
                 round(sprite.get_height() * size[1] / BASE_SCREEN_SIZE[1])
             ))
-        parts = list(asset.parts[asset.parts.index("sprites"):])
-        parts[-1] = asset.stem
-        exec("_cache" + construct_dict_call(parts) + "= sprite", globals(), locals())
+        sprites[asset.relative_to(ATLAS_SOURCE_DIR).with_suffix("").parts] = sprite
 
         log.debug(f"Loaded {asset.name} at startup")
 
+    _derive_variants(sprites)
+
+    page_sizes, positions = _pack({name: sprite.get_size() for name, sprite in sprites.items()})
+    pages = [pygame.Surface(page_size, pygame.SRCALPHA).convert_alpha() for page_size in page_sizes]
+    for name, (page, rect) in positions.items():
+        # the pages are transparent, so this copies the pixels as they are
+        pages[page].blit(sprites[name], rect, special_flags=pygame.BLEND_RGBA_MAX)
+
+    _set_atlas(pages, positions)
+    log.debug(f"Packed {len(sprites)} sprites in {len(pages)} atlas pages of sizes {page_sizes}")
+
+
+def _read_atlas(path, size, pixel_format):
+    """
+    Maps the atlas in memory, returns False if it is missing or outdated.
+    """
+    try:
+        with open(path, "rb") as f:
+            # copy on write, the sprites stay writable and the file untouched
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        magic, header_size = ATLAS_HEADER.unpack_from(data)
+        if magic != ATLAS_MAGIC:
+            return False
+        header = json.loads(data[ATLAS_HEADER.size:ATLAS_HEADER.size + header_size])
+        if not _is_up_to_date(header, size, pixel_format):
+            log.info("The sprite atlas is outdated")
+            return False
+    except (OSError, ValueError, KeyError, struct.error):
+        return False
+
+    view = memoryview(data)[ATLAS_HEADER.size + header_size:]
+    pages = []
+    for page in header["pages"]:
+        width, height = page["size"]
+        offset = page["offset"]
+        pages.append(pygame.image.frombuffer(view[offset:offset + width * height * 4], (width, height), pixel_format))
+
+    _set_atlas(pages, {
+        tuple(sprite["name"]): (sprite["page"], pygame.Rect(sprite["rect"])) for sprite in header["sprites"]
+    })
+    _cache["atlas_data"] = data  # the pages use it
+
+    log.debug(f"Loaded {len(header['sprites'])} sprites from the atlas")
+    return True
+
+
+def _write_atlas(path, size, pixel_format):
+    pages = _cache["atlas"]
+    parents = {page: i for i, page in enumerate(pages)}
+
+    sources, dirs = _get_sources()
+    header = {
+        "version": ATLAS_VERSION,
+        "size": size,
+        "format": pixel_format,
+        "sources": sources,
+        "dirs": dirs,
+        "variants": _get_variant_names(),
+        "pages": [],
+        "sprites": [
+            {"name": name, "page": parents[sprite.get_parent()], "rect": list(sprite.get_offset() + sprite.get_size())}
+            for name, sprite in _cache["sprites"].items()
+        ]
+    }
+
+    pixels = [pygame.image.tobytes(page, pixel_format) for page in pages]
+    offset = 0
+    for page, page_pixels in zip(pages, pixels):
+        header["pages"].append({"size": page.get_size(), "offset": offset})
+        offset += len(page_pixels)
+    header = json.dumps(header).encode()
+
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(ATLAS_HEADER.pack(ATLAS_MAGIC, len(header)))
+            f.write(header)
+            for page_pixels in pixels:
+                f.write(page_pixels)
+        os.replace(tmp_path, path)  # so that a half written atlas is never read
+    except OSError:
+        log.warning("Failed to write the sprite atlas", exc_info=True)
+        return
+
+    log.info(f"Wrote the sprite atlas ({offset / 1024:.0f} KiB)")
+
+
+def _load_masks():
+    for sprite in _cache["sprites"].values():  # the variants too, they are turned or have the same shape
+        _cache["masks"][sprite] = pygame.mask.from_surface(sprite)
+
+    log.debug(f"Created {len(_cache['masks'])} collision masks at startup")
+
 
 def get_sprite(*name):
-    possible_sprite = eval("_cache['sprites']" + construct_dict_call(name), globals(), locals())
-    if isinstance(possible_sprite, defaultdict):
+    try:
+        return _cache["sprites"][name]
+    except KeyError:
         log.warning(f"Failed to get sprite {'/'.join(name)}")
-        return _cache["sprites"]["error"]
-    return possible_sprite
+        return _cache["sprites"][ERROR_SPRITE]
+
+
+def get_variant(sprite, variant):
+    """
+    Returns a variant of a sprite, like "damaged" (see filters.apply_filter).
+    The variants the sprites need should be declared by their handles so that they are precomputed.
+    """
+    try:
+        return _cache["sprites"][_cache["names"][sprite] + (variant,)]
+    except KeyError:
+        pass
+
+    try:
+        return _cache["variants"][sprite, variant]
+    except KeyError:
+        img = _cache["variants"][sprite, variant] = apply_filter(sprite, variant)
+        log.warning(f"Created the {variant} variant of a sprite after startup")
+        return img
+
+
+def get_damaged(sprite):
+    return get_variant(sprite, "damaged")
+
+
+def get_healed(sprite):
+    return get_variant(sprite, "healed")
+
+
+def get_rotated(sprite, angle):
+    return get_variant(sprite, rotated_name(angle))
+
+
+def get_mask(sprite):
+    """
+    Returns the collision mask of a sprite, shared by everything using that sprite.
+    """
+    try:
+        return _cache["masks"][sprite]
+    except KeyError:
+        mask = _cache["masks"][sprite] = pygame.mask.from_surface(sprite)
+        log.debug("Created a collision mask after startup")
+        return mask
+
+
+class SpriteHandle:
+    """
+    A reference to a sprite that can be created before the assets are loaded,
+    for example at class definition. The sprite is only looked up once per asset load.
+    The variants are chains of filters, like ("rotated+180", "damaged"), to precompute for the sprite.
+    """
+    __slots__ = ("name", "_sprite", "_generation")
+
+    def __init__(self, *name, variants=()):
+        self.name = name
+        for variant in variants:
+            for i in range(1, len(variant) + 1):  # the variants it is derived from are needed too
+                _variants[name].add(tuple(variant[:i]))
+        self._sprite = None
+        self._generation = None
+
+    def get(self):
+        if self._generation != _generation:
+            self._sprite = get_sprite(*self.name)
+            self._generation = _generation
+        return self._sprite
 
 
 def get_font(name, size):
@@ -0,0 +1,121 @@
+import random
+
+import pygame
+
+from .assets import get_sprite
+from .constants import (BASE_SCREEN_SIZE, BG_SCROOL_SPEED, BLACK,
+                        STARFIELD_LAYERS, STARFIELD_SEED)
+from .entities import np
+
+
+class BaseBackground:
+    def __init__(self, game):
+        self.game = game
+
+    def update(self):
+        pass
+
+    def draw(self, surface):
+        pass
+
+    def restore(self, surface, rects):
+        """
+        Redraws the background in the given rects, it is not moving when this is used.
+        """
+        pass
+
+
+class ImageBackground(BaseBackground):
+    def __init__(self, game):
+        super().__init__(game)
+
+        self.image = get_sprite("background").convert()  # opaque, much faster to blit
+        self.rect = self.image.get_rect(topleft=(0, 0))
+        self.y_pos = 0.0
+
+    def update(self):
+        self.y_pos += BG_SCROOL_SPEED * self.game.scale * self.game.delta
+        if self.y_pos >= self.game.screen_height:
+            self.y_pos = self.game.screen_height - self.image.get_height()
+
+    def draw(self, surface):
+        self.rect.y = self.y_pos
+
+        if self.rect.y > 0:
+            surface.blit(self.image, (0, self.rect.y - self.game.screen_height))
+
+        # sub = self.image.subsurface((0, 0), self.screen_size)  TODO: subsurface?
+        surface.blit(self.image, self.rect)
+
+    def restore(self, surface, rects):
+        image = self.image
+        surface.blits([(image, rect, rect) for rect in rects], doreturn=False)
+
+
+class StarLayer:
+    __slots__ = ("speed", "star", "xs", "ys")
+
+    def __init__(self, speed, star, xs, ys):
+        self.speed = speed
+        self.star = star
+        self.xs = xs
+        self.ys = ys
+
+
+class Starfield(BaseBackground):
+    """
+    A procedural parallax starfield, generated from a seed. Each layer is drawn with a single blits call.
+    With numpy, the stars of a layer are moved at once, in place, otherwise one by one.
+    """
+    def __init__(self, game, seed=STARFIELD_SEED, layers=STARFIELD_LAYERS):
+        super().__init__(game)
+
+        rng = random.Random(seed)
+        width, height = game.screen_size
+        scale = width / BASE_SCREEN_SIZE[0]
+
+        self.layers = []
+        for speed, size, count, brightness in layers:
+            size = max(1, round(size * scale))
+            star = pygame.Surface((size, size))
+            star.fill((brightness, brightness, brightness))
+
+            xs = [rng.uniform(0, width) for _ in range(count)]  # the stars only move down
+            ys = [rng.uniform(0, height) for _ in range(count)]
+            self.layers.append(StarLayer(
+                speed * BG_SCROOL_SPEED * scale, star, xs, np.array(ys, np.float32) if np is not None else ys
+            ))
+
+        self.frozen = None  # the starfield drawn once, for restoring it
+
+    def update(self):
+        height = self.game.screen_height
+        for layer in self.layers:
+            move = layer.speed * self.game.delta
+            if np is not None:
+                ys = layer.ys
+                ys += move
+                np.remainder(ys, height, out=ys)
+            else:
+                layer.ys = [(y + move) % height for y in layer.ys]
+
+    def draw(self, surface):
+        surface.fill(BLACK)
+        for layer in self.layers:
+            star = layer.star
+            ys = layer.ys.tolist() if np is not None else layer.ys
+            surface.blits([(star, pos) for pos in zip(layer.xs, ys)], doreturn=False)
+
+    def restore(self, surface, rects):
+        if self.frozen is None:
+            self.frozen = pygame.Surface(self.game.screen_size)
+            self.draw(self.frozen)
+
+        frozen = self.frozen
+        surface.blits([(frozen, rect, rect) for rect in rects], doreturn=False)
+
+
+BACKGROUNDS = {
+    "image": ImageBackground,
+    "starfield": Starfield
+}
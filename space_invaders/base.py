@@ -1,12 +1,103 @@
 import pygame
 
+from .assets import SpriteHandle
+
 
 class BaseSprite(pygame.sprite.Sprite):
+    sprite_dir = None  # where the sprite's image is, in the sprites folder
+    sprite_variants = ()  # variants of the image to precompute when loading the assets
+    slot = None  # index in the entity store, if the sprite is in one
+    x = y = 0.0  # where the rect's topleft really is, the rect is rounded and follows it once per tick
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        # resolve the image once, when the class is defined
+        if cls.sprite_dir and "image_name" in cls.__dict__:
+            cls.sprite = SpriteHandle(cls.sprite_dir, cls.image_name, variants=cls.sprite_variants)
+
     def __init__(self, game):
         super().__init__()
 
         self.game = game
 
+    def place(self, **position):
+        """
+        Moves the rect and the position, like place(center=pos).
+        """
+        for name, value in position.items():
+            setattr(self.rect, name, value)
+        self.x, self.y = self.rect.topleft
+
+    def sync_rect(self):
+        self.rect.topleft = (self.x, self.y)
+
     def set_default(self, name, value):
         if not hasattr(self, name):
             setattr(self, name, value)
+
+
+class InterpolatedGroup(pygame.sprite.Group):
+    """
+    A group that draws its sprites between their positions of the last two logic ticks.
+    Updating it syncs the rects of the sprites to their positions, unless an entity store does.
+    """
+    def __init__(self, *sprites):
+        super().__init__(*sprites)
+        self.last_positions = {}
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.last_positions.pop(sprite, None)  # pooled sprites might come back somewhere else
+
+    def save_positions(self):
+        """
+        Needs to be called at the start of every tick, before anything moves.
+        """
+        self.last_positions = {sprite: (sprite.x, sprite.y) for sprite in self.sprites()}
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        for sprite in self.sprites():
+            if sprite.slot is None:
+                sprite.sync_rect()
+
+    def draw(self, surface, alpha=1.0, doreturn=False):
+        last_positions = self.last_positions
+        blits = []
+        for sprite in self.sprites():
+            x, y = sprite.x, sprite.y
+            last_x, last_y = last_positions.get(sprite, (x, y))
+            blits.append((sprite.image, (last_x + (x - last_x) * alpha, last_y + (y - last_y) * alpha)))
+
+        return surface.blits(blits, doreturn=doreturn)
+
+    def queue(self, render_queue, layer, alpha=1.0):
+        """
+        Like draw, but adds the sprites that are on the surface to a render queue.
+        """
+        last_positions = self.last_positions
+        width, height = render_queue.size
+        append = render_queue.layers[layer].append
+        for sprite in self.spritedict:  # not copied, nothing is removed while drawing
+            x, y = sprite.x, sprite.y
+            last_x, last_y = last_positions.get(sprite, (x, y))
+            x = last_x + (x - last_x) * alpha
+            y = last_y + (y - last_y) * alpha
+
+            rect = sprite.rect
+            if x < width and y < height and x + rect.width > 0 and y + rect.height > 0:
+                append((sprite.image, (x, y)))
+
+
+class PooledSprite(BaseSprite):
+    """
+    A sprite that goes back to its scene's pool when killed.
+    """
+    def reset(self, *args):
+        pass
+
+    def kill(self):
+        if self.alive():
+            super().kill()
+            self.scene.pool.release(self)
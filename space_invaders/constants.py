@@ -14,39 +14,88 @@ else:
     DIR = pathlib.Path(__file__).parents[0]
 
 ASSETS_DIR = DIR / "assets"
+CACHE_DIR = DIR / "cache"  # sprite atlases, pre-scaled
+WAVES_PATH = ASSETS_DIR / "waves.json"
+
+# sprite atlas
+ATLAS_WIDTH = 1024  # unless a sprite is wider
+ATLAS_MAX_HEIGHT = 4096  # a new page is started past that
 
 # window
-BASE_SCREEN_SIZE = (800, 450)  # 16:9
+BASE_SCREEN_SIZE = (800, 450)  # 16:9, the sizes and speeds here are at this size, the game scales them
 
 SCREEN_SIZE = tuple([round(val * 1.5) for val in BASE_SCREEN_SIZE])
 WINDOW_TITLE = "Space Invaders"
 
+# render modes: native draws at SCREEN_SIZE, the others draw at BASE_SCREEN_SIZE and scale it to the window,
+# scaled with SDL (any factor, by the GPU if possible), integer with a whole factor for sharp pixels
+RENDER_MODES = ("native", "scaled", "integer")
+RENDER_MODE = "native"
+INTEGER_WINDOW_SCALE = 2  # the integer mode's window starts at this factor, if the display is big enough
+
 # display flags
 DISPLAY_FLAGS = pygame.DOUBLEBUF
 
+# only update the regions of the screen that changed during gameplay, the background stops scrolling
+DIRTY_RECTS = False
+DIRTY_RECTS_MAX_COVERAGE = 0.5  # if the dirty rects cover more of the screen, it is redrawn fully
+
+# background, "image" or "starfield"
+BACKGROUND = "image"
+
+STARFIELD_SEED = 0
+STARFIELD_LAYERS = (  # speed (relative to BG_SCROOL_SPEED), size, star count, brightness
+    (0.25, 1, 150, 90),
+    (0.5, 1, 80, 160),
+    (1, 2, 30, 255)
+)
+
 # speed
 BASE_FPS = 60
 GAME_SPEED_INFLUENCER = 1000 / BASE_FPS  # the higher, the slower
 
-BG_SCROOL_SPEED = 1 * SCREEN_SIZE[1] / BASE_SCREEN_SIZE[1]
+TICK_RATE = 60  # game logic updates per second, independent from the rendering
+MAX_TICKS_PER_FRAME = 5  # if we are late by more, the game slows down
+
+# frame pacing, how the main loop waits for the next frame: tick sleeps (coarse), busy spins (precise, uses a core),
+# vsync waits for the display (with the scaled render mode), uncapped doesn't wait and low-latency sleeps
+# until just before the frame is due, so that the inputs are read as late as possible (with vsync if it can)
+PACING_MODES = ("tick", "busy", "vsync", "uncapped", "low-latency")
+PACING = "tick"
+PACING_HISTORY = 600  # frames and key presses in the pacing stats
+LOW_LATENCY_MARGIN = 2  # ms, between when a low-latency frame is expected to be shown and when it is due
+PACING_SNAP = 0.002  # frames this close to a tick run exactly one, the jitter would make them run none or two
+SNAPPED_PACING_MODES = ("vsync", "low-latency")  # the modes showing frames at the display rate
+
+BG_SCROOL_SPEED = 1
 TEXT_BLINK_SPEED = 5
 TEXT_RESIZE_SPEED = 0.5
+TEXT_MIN_OPACITY = 50  # the blinking text goes between this and fully opaque
+TEXT_SIZE_RANGE = (85, 105)  # in percents of the normal size
+
+# headless mode
+HEADLESS_FRAMES = 10_000  # default number of frames to simulate
 
 # mouse
 MOUSE_VISIBLE_TIME = 2
 
 # font
-FONT_SIZE = round(14 * SCREEN_SIZE[0] / BASE_SCREEN_SIZE[0])
+FONT_SIZE = 14
+
+# text cache
+TEXT_CACHE_BUDGET = 32 * 1024 ** 2  # in bytes
+TEXT_OPACITY_STEP = 5  # the animated text is only rendered at these steps
+TEXT_SCALE_STEP = 2  # in percents
 
 # ships
 DAMAGED_EFFECT_STAY_TIME = 0.1
 
 # our ship
-SHIP_SPEED = 6 * SCREEN_SIZE[0] / BASE_SCREEN_SIZE[0]
+SHIP_SPEED = 6
 SHIP_HEALTH = 20
 
 # enemi ships
-ENEMI_SHIP_SPAWN_INTERVAL = 2500
+ENEMI_SHIP_SPAWN_INTERVAL = 2.5  # in seconds
 DEFAULT_ENEMI_SHIP_HEALTH = 3
 DEFAULT_ENEMI_SHIP_SPEED = 3
 
@@ -55,12 +104,25 @@ DEFAULT_LASER_SPEED = 5
 DEFAULT_LASER_DAMAGE = 1
 
 # power-ups
-POWERUP_SPAWN_INTERVAL = 45_000  # every 45 secs
+POWERUP_SPAWN_INTERVAL = 45  # in seconds
+
+# collisions
+COLLISION_CELL_SIZE = 64  # size of the spatial hash's cells
+
+# entity store
+ENTITY_STORE = True  # move the enemi ships and lasers in batch, if numpy is installed
+ENTITY_STORE_CAPACITY = 256  # initial capacity, it grows when needed
+
+# sprite pools
+POOL_MAX_SIZE = 512  # per sprite type
+
+# frame profiler
+PROFILER_HISTORY = 300  # frames in the percentiles and the graph
+PROFILER_REFRESH = 15  # frames between updates of the overlay
+PROFILER_GRAPH_SIZE = (300, 100)
 
 # custom events
-SHIP_SPAWN_EVENT = pygame.USEREVENT + 1
-DEATH_EVENT = pygame.USEREVENT + 2
-POWERUP_SPAWN_EVENT = pygame.USEREVENT + 3
+DEATH_EVENT = pygame.USEREVENT + 1
 
 # blocked events
 BLOCKED_EVENTS = [  # events not in use, blocked for performance
@@ -70,13 +132,13 @@ BLOCKED_EVENTS = [  # events not in use, blocked for performance
     pygame.JOYBALLMOTION,
     pygame.JOYBUTTONDOWN,
     pygame.JOYBUTTONUP,
-    pygame.JOYHATMOTION,
-    pygame.VIDEORESIZE  # TODO: remove when screen resizing suport is added
+    pygame.JOYHATMOTION
 ]
 
 # keybinds
 PAUSE_KEY = pygame.K_ESCAPE
 FULLSCREEN_KEY = pygame.K_F11
+PROFILER_KEY = pygame.K_F3
 SHOOT_KEY = pygame.K_SPACE
 RESTART_KEY = pygame.K_r
 START_KEY = pygame.K_RETURN
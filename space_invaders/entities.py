@@ -0,0 +1,203 @@
+import logging
+import math
+
+from .base import InterpolatedGroup
+from .constants import DAMAGED_EFFECT_STAY_TIME, ENTITY_STORE_CAPACITY
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+log = logging.getLogger(__name__)
+
+FIELDS = {
+    # position (of the rect's topleft) and velocity, in pixels per delta
+    "x": float,
+    "y": float,
+    "vx": float,
+    "vy": float,
+    "width": float,
+    "height": float,
+    # flags
+    "active": bool,
+    "bounces": bool,  # turns around at the sides of the screen
+    "culled": bool,  # killed when leaving the screen from the top or the bottom
+    "spawning": bool,  # moving down until it crosses its spawn line
+    "rams": bool,  # rams our ship when touching it
+    "damaged": bool,  # shows its damaged image
+    # times
+    "spawn_line": float,
+    "next_shot": float,
+    "shoot_interval": float,
+    "hit_time": float
+}
+
+
+class EntityStore:
+    """
+    Struct of arrays holding the movement and shooting state of the enemi ships and lasers,
+    so that they can all be updated at once with numpy. Sprites keep their index in the arrays
+    as their slot, and provide the data through their add_entity method. The store is the source
+    of their positions, it copies them to the sprites and their rects at every step.
+    Health stays on the sprites, it only changes on collisions.
+    Ships in the store need no per-sprite update, lasers still check their collisions in theirs.
+    """
+    def __init__(self, game, capacity=ENTITY_STORE_CAPACITY):
+        if np is None:
+            raise RuntimeError("numpy is needed by the entity store")
+
+        self.game = game
+        self.time = 0.0  # of the last step
+
+        self.sprites = []  # slot -> sprite, None if the slot is free
+        self.free = []
+
+        self.capacity = 0
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        for name, dtype in FIELDS.items():
+            array = np.zeros(capacity, dtype)
+            if self.capacity:
+                array[:self.capacity] = getattr(self, name)
+            setattr(self, name, array)
+
+        self.capacity = capacity
+        log.debug(f"Entity store capacity is now {capacity}")
+
+    def __len__(self):
+        return len(self.sprites) - len(self.free)
+
+    def add(self, sprite, vx, vy, *, bounces=False, culled=False, rams=False, spawn_line=None, shoot_interval=None):
+        if self.free:
+            slot = self.free.pop()
+            self.sprites[slot] = sprite
+        else:
+            slot = len(self.sprites)
+            if slot == self.capacity:
+                self._grow(self.capacity * 2)
+            self.sprites.append(sprite)
+
+        self.x[slot], self.y[slot] = sprite.x, sprite.y
+        self.width[slot], self.height[slot] = sprite.rect.size
+        self.vx[slot] = vx
+        self.vy[slot] = vy
+
+        self.active[slot] = True
+        self.bounces[slot] = bounces
+        self.culled[slot] = culled
+        self.spawning[slot] = spawn_line is not None
+        self.rams[slot] = rams
+        self.damaged[slot] = False
+
+        self.spawn_line[slot] = spawn_line or 0
+        self.next_shot[slot] = math.inf  # set once spawned
+        self.shoot_interval[slot] = shoot_interval or math.inf
+
+        return slot
+
+    def hit(self, slot):
+        self.damaged[slot] = True
+        self.hit_time[slot] = self.time
+
+    def remove(self, slot):
+        self.active[slot] = False
+        self.vx[slot] = self.vy[slot] = 0
+        self.sprites[slot] = None
+        self.free.append(slot)
+
+    def step(self, delta, now):
+        """
+        Moves every entity, makes them turn, shoot, ram our ship and get culled, then updates the sprites.
+        """
+        self.time = now
+
+        n = len(self.sprites)
+        active = self.active[:n]
+        x, y, vx, vy = self.x[:n], self.y[:n], self.vx[:n], self.vy[:n]
+        width, height = self.width[:n], self.height[:n]
+        spawning, next_shot, shoot_interval = self.spawning[:n], self.next_shot[:n], self.shoot_interval[:n]
+
+        # movement
+        x += vx * delta
+        y += vy * delta
+
+        # ships that are fully spawned stop going down and start shooting
+        spawned = active & spawning & (y + height / 2 > self.spawn_line[:n])
+        vy[spawned] = 0
+        spawning[spawned] = False
+        next_shot[spawned] = now + shoot_interval[spawned]
+
+        # ships reaching a border turn around
+        turning = active & self.bounces[:n] & ((x < 0) | (x + width > self.game.screen_width))
+        vx[turning] *= -1
+
+        # shooting
+        firing = active & (next_shot <= now)
+        next_shot[firing] += shoot_interval[firing]
+
+        # damage effects that are over
+        healed = active & self.damaged[:n] & ((now - self.hit_time[:n]) >= DAMAGED_EFFECT_STAY_TIME)
+        self.damaged[:n][healed] = False
+
+        # ships touching ours, the sprites check the exact collision
+        ship_x, ship_y, ship_w, ship_h = self.game.ship.rect
+        ramming = active & self.rams[:n] & (
+            (x < ship_x + ship_w) & (x + width > ship_x) & (y < ship_y + ship_h) & (y + height > ship_y)
+        )
+
+        # what has left the screen
+        culling = active & self.culled[:n] & (
+            ((vy > 0) & (y > self.game.screen_height)) | ((vy < 0) & (y + height <= 0))
+        )
+
+        # sync the sprites
+        sprites = self.sprites
+        for slot, pos_x, pos_y in zip(np.flatnonzero(active).tolist(), x[active].tolist(), y[active].tolist()):
+            sprite = sprites[slot]
+            sprite.x, sprite.y = pos_x, pos_y
+            sprite.rect.topleft = (pos_x, pos_y)
+
+        turning, firing, healed, ramming, culling = [
+            [sprites[slot] for slot in np.flatnonzero(mask).tolist()]
+            for mask in (turning, firing, healed, ramming, culling)
+        ]
+
+        for sprite in turning:
+            sprite.direction = int(not sprite.direction)
+            sprite.on_turn()
+        for sprite in firing:
+            sprite.fire()
+        for sprite in healed:
+            sprite.restore_image()
+        for sprite in ramming:
+            sprite.ram()
+        for sprite in culling:
+            sprite.kill()
+
+
+class EntityGroup(InterpolatedGroup):
+    """
+    A group whose sprites are moved by an entity store, if there is one.
+    If the store takes care of everything for the sprites, updating the group does nothing.
+    """
+    def __init__(self, store, *sprites, store_only=False):
+        self.store = store
+        self.store_only = store_only
+        super().__init__(*sprites)
+
+    def update(self, *args, **kwargs):
+        if self.store is None or not self.store_only:
+            super().update(*args, **kwargs)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        if self.store is not None:
+            sprite.add_entity(self.store)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        if self.store is not None:
+            self.store.remove(sprite.slot)
+            sprite.slot = None
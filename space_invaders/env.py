@@ -0,0 +1,248 @@
+"""
+An environment to train bots against the game, with the reset/step API of gymnasium (which isn't needed).
+Needs numpy. VectorEnv steps several games in subprocesses, their observations are in shared memory.
+"""
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+
+import pygame
+
+from .constants import SHIP_HEALTH, TICK_RATE
+from .entities import np
+from .scenes import DeathScene
+from .simulation import BasePilot
+from .ships import EnemiShip, HeavyEnemiShip, RamShip
+
+MAX_SHIPS = 64  # the others aren't in the observations
+MAX_LASERS = 128
+FRAME_SIZE = (160, 90)
+MAX_SECONDS = 10 * 60  # the episodes are truncated after this long
+
+DAMAGE_PENALTY = 0.1  # reward lost per health point lost, a point of score is a reward of 1
+
+# action -> direction, shoot
+ACTIONS = ((0, False), (-1, False), (1, False), (0, True), (-1, True), (1, True))
+SHIP_TYPES = (EnemiShip, HeavyEnemiShip, RamShip)
+
+
+def get_observation_space(frame=False):
+    """
+    Returns the shape and dtype of each array of the observations.
+    Positions are fractions of the screen size and speeds fractions of it per tick.
+    """
+    space = {
+        "ship": ((3,), np.float32),  # x, y, health
+        "ships": ((MAX_SHIPS, 6), np.float32),  # x, y, vx, vy, health, type (0 for no ship)
+        "lasers": ((MAX_LASERS, 4), np.float32),  # x, y, vy, is enemi (-1 for no laser)
+    }
+    if frame:
+        space["frame"] = ((FRAME_SIZE[1], FRAME_SIZE[0], 3), np.uint8)
+    return space
+
+
+class _ActionPilot(BasePilot):
+    action = 0
+
+    def decide(self, game):
+        return ACTIONS[self.action]
+
+
+class Env:
+    """
+    One game. Every step lasts frame_skip ticks, with the same action.
+    The arrays of the observations are reused, they change at the next step or reset.
+    """
+    def __init__(self, seed=None, frame=False, frame_skip=1, max_seconds=MAX_SECONDS):
+        if np is None:
+            raise RuntimeError("numpy is needed by the environment")
+
+        from . import setup_headless
+        from .game import Game
+
+        setup_headless()
+        pygame.init()
+        self.game = Game(seed=seed)
+
+        self.frame_skip = frame_skip
+        self.max_ticks = round(max_seconds * TICK_RATE)
+
+        self.observation = {
+            name: np.zeros(shape, dtype) for name, (shape, dtype) in get_observation_space(frame).items()
+        }
+        self.frame_surf = pygame.Surface(FRAME_SIZE) if frame else None
+
+        self.scene = None
+        self.pilot = None
+        self.ticks = 0
+
+    def reset(self, seed=None):
+        game = self.game
+        if seed is not None:
+            game.random.seed(seed)
+
+        if self.scene:
+            self.scene.cleanup()  # the death scene in front of it doesn't
+        pygame.event.clear()
+        game.pressed_keys.clear()
+        game.start_new_game()
+        self.scene = game.scene
+
+        self.pilot = _ActionPilot(None)
+        self.ticks = 0
+        return self._observe(), self._get_info()
+
+    def step(self, action):
+        game = self.game
+        score, health = game.score, game.ship.health
+
+        self.pilot.action = action
+        terminated = False
+        for _ in range(self.frame_skip):
+            for event in self.pilot.get_events(game):
+                pygame.event.post(event)
+            game.step()
+            self.ticks += 1
+
+            if isinstance(game.scene, DeathScene):
+                terminated = True
+                break
+        truncated = not terminated and self.ticks >= self.max_ticks
+
+        reward = (game.score - score) - (health - game.ship.health) * DAMAGE_PENALTY
+        return self._observe(), reward, terminated, truncated, self._get_info()
+
+    def _get_info(self):
+        return {"score": self.game.score, "wave": self.scene.wave_count, "ticks": self.ticks}
+
+    def _observe(self):
+        game = self.game
+        scene = self.scene  # even once the death scene is in front of it
+        width, height = game.screen_size
+        obs = self.observation
+
+        ship = game.ship
+        obs["ship"][:] = ship.rect.centerx / width, ship.rect.centery / height, ship.health / SHIP_HEALTH
+
+        ships = obs["ships"]
+        ships[:] = 0
+        for i, enemi in zip(range(MAX_SHIPS), scene.enemi_ships):
+            vx, vy = enemi.velocity
+            ships[i] = (
+                enemi.rect.centerx / width, enemi.rect.centery / height, vx * game.delta / width,
+                vy * game.delta / height, enemi.health / enemi.max_health, SHIP_TYPES.index(type(enemi)) + 1
+            )
+
+        lasers = obs["lasers"]
+        lasers[:] = -1
+        for i, laser in zip(range(MAX_LASERS), scene.lasers):
+            vy = laser.velocity[1]
+            lasers[i] = laser.rect.centerx / width, laser.rect.centery / height, vy * game.delta / height, vy > 0
+
+        if self.frame_surf:
+            scene.clear_screen()
+            scene.draw()
+            pygame.transform.scale(game.screen, FRAME_SIZE, self.frame_surf)
+            # a view of the pixels, (width, height, 3), copied once in the observation
+            pixels = pygame.surfarray.pixels3d(self.frame_surf)
+            obs["frame"][:] = pixels.swapaxes(0, 1)
+            del pixels  # unlocks the surface
+
+        return obs
+
+    def close(self):
+        self.game.close()
+        pygame.quit()
+
+
+def _worker(index, count, pipe, memory_names, kwargs):
+    env = Env(**kwargs)
+    memories = {name: SharedMemory(memory_name) for name, memory_name in memory_names.items()}
+    shared = {  # this game's part of the stacked observations
+        name: np.ndarray(shape, dtype, memories[name].buf)[index]
+        for name, (shape, dtype) in _get_vector_space(kwargs.get("frame", False), count).items()
+    }
+
+    def publish(obs):
+        for name, array in obs.items():
+            shared[name][:] = array
+
+    try:
+        while True:
+            command, arg = pipe.recv()
+            if command == "reset":
+                obs, info = env.reset(arg)
+                publish(obs)
+                pipe.send(info)
+            elif command == "step":
+                obs, reward, terminated, truncated, info = env.step(arg)
+                if terminated or truncated:  # start the next episode right away, the info is of the last one
+                    obs, _ = env.reset()
+                publish(obs)
+                pipe.send((reward, terminated, truncated, info))
+            else:
+                break
+    finally:
+        env.close()
+        for memory in memories.values():
+            memory.close()
+
+
+def _get_vector_space(frame, count):
+    return {
+        name: ((count, *shape), dtype) for name, (shape, dtype) in get_observation_space(frame).items()
+    }
+
+
+class VectorEnv:
+    """
+    Several games in subprocesses, stepped at the same time. The observations are stacked,
+    in shared memory (they change at the next step or reset), finished games are reset right away.
+    """
+    def __init__(self, count, seed=0, **kwargs):
+        if np is None:
+            raise RuntimeError("numpy is needed by the environment")
+
+        self.count = count
+        self.seed = seed
+        space = _get_vector_space(kwargs.get("frame", False), count)
+
+        self.memories = {
+            name: SharedMemory(create=True, size=int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            for name, (shape, dtype) in space.items()
+        }
+        self.observation = {
+            name: np.ndarray(shape, dtype, self.memories[name].buf) for name, (shape, dtype) in space.items()
+        }
+
+        context = multiprocessing.get_context("spawn")  # nothing of pygame is inherited
+        memory_names = {name: memory.name for name, memory in self.memories.items()}
+        self.pipes = []
+        self.processes = []
+        for i in range(count):
+            pipe, child_pipe = context.Pipe()
+            process = context.Process(
+                target=_worker, args=(i, count, child_pipe, memory_names, {"seed": seed + i, **kwargs}), daemon=True
+            )
+            process.start()
+            self.pipes.append(pipe)
+            self.processes.append(process)
+
+    def reset(self):
+        for i, pipe in enumerate(self.pipes):
+            pipe.send(("reset", self.seed + i))
+        return self.observation, [pipe.recv() for pipe in self.pipes]
+
+    def step(self, actions):
+        for pipe, action in zip(self.pipes, actions):
+            pipe.send(("step", int(action)))
+        rewards, terminated, truncated, infos = zip(*(pipe.recv() for pipe in self.pipes))
+        return self.observation, np.array(rewards), np.array(terminated), np.array(truncated), list(infos)
+
+    def close(self):
+        for pipe in self.pipes:
+            pipe.send(("close", None))
+        for process in self.processes:
+            process.join()
+        for memory in self.memories.values():
+            memory.close()
+            memory.unlink()
@@ -1,24 +1,32 @@
-import functools
-
 import pygame
 
 from .constants import GREEN, RED
 
 
-@functools.lru_cache()
-def get_damaged(img):
+def damaged(img):
     img = img.copy()
     img.fill(RED, special_flags=pygame.BLEND_RGB_ADD)
     return img
 
 
-@functools.lru_cache()
-def get_healed(img):
+def healed(img):
     img = img.copy()
     img.fill(GREEN, special_flags=pygame.BLEND_RGB_ADD)
     return img
 
 
-@functools.lru_cache()
-def get_rotated(img, angle):
+def rotated(img, angle):
     return pygame.transform.rotate(img, angle)
+
+
+def rotated_name(angle):
+    return f"rotated{angle:+}"
+
+
+def apply_filter(img, variant):
+    """
+    Applies a filter by its variant name, "damaged", "healed" or "rotated" followed by a signed angle.
+    """
+    if variant.startswith("rotated"):
+        return rotated(img, int(variant[len("rotated"):]))
+    return {"damaged": damaged, "healed": healed}[variant](img)
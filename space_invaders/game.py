@@ -1,18 +1,24 @@
 import logging
+import random
 import time
 from collections import defaultdict
 
 import pygame
 
 from .assets import load_assets
-from .constants import (BASE_FPS, BLOCKED_EVENTS, DEATH_EVENT, DISPLAY_FLAGS,
-                        FULLSCREEN_KEY, GAME_SPEED_INFLUENCER,
-                        MOUSE_VISIBLE_TIME, PAUSE_KEY, SCREEN_SIZE,
-                        WINDOW_TITLE)
+from .constants import (BACKGROUND, BASE_SCREEN_SIZE, BLACK, BLOCKED_EVENTS, DEATH_EVENT,
+                        DIRTY_RECTS, DISPLAY_FLAGS, FONT_SIZE, FULLSCREEN_KEY, GAME_SPEED_INFLUENCER,
+                        INTEGER_WINDOW_SCALE, MAX_TICKS_PER_FRAME, MOUSE_VISIBLE_TIME, PACING, PACING_SNAP, PAUSE_KEY,
+                        PROFILER_KEY, RENDER_MODE, SCREEN_SIZE, SNAPPED_PACING_MODES, TICK_RATE, WINDOW_TITLE)
+from .pacing import Pacer
+from .profiler import (CLEAR, DRAW, EVENTS, OVERLAY, TICK, UPDATE,
+                       UPDATE_SCREEN, FrameProfiler)
+from .replay import InputRecorder, InputReplay
 from .scenes import DeathScene, PauseScene, WelcomeScene
 from .scenes.base import MenuScene
 from .scenes.game import MainScene
 from .ships import Ship
+from .waves import load_waves
 
 log = logging.getLogger(__name__)
 
@@ -22,34 +28,88 @@ class Stop(Exception):
 
 
 class Game:
-    def __init__(self):
-        # screen
+    def __init__(self, tick_rate=TICK_RATE, dirty_rects=DIRTY_RECTS, background=BACKGROUND, profile_path=None,
+                 seed=None, record_path=None, replay_path=None, render_mode=RENDER_MODE, pacing=PACING):
+        # a replay brings its own settings
+        self.replay = InputReplay(replay_path) if replay_path else None
+        if self.replay:
+            seed = self.replay.seed
+            tick_rate = self.replay.tick_rate
+
+        # screen, what everything is drawn on, and the window showing it
         self.display_info = pygame.display.Info()
 
-        self.screen_size = self.screen_width, self.screen_height = SCREEN_SIZE
+        self.render_mode = render_mode
+        self.screen_size = self.screen_width, self.screen_height = \
+            SCREEN_SIZE if render_mode == "native" else BASE_SCREEN_SIZE
+        self.scale = self.screen_width / BASE_SCREEN_SIZE[0]  # of the sizes and speeds
+        self.font_size = round(FONT_SIZE * self.scale)
 
         pygame.display.set_caption(WINDOW_TITLE)
 
-        self.screen = pygame.display.set_mode(SCREEN_SIZE, DISPLAY_FLAGS)
+        if pacing == "vsync" and render_mode != "scaled":
+            log.warning("vsync needs the scaled render mode, the frames are paced by busy waiting instead")
+            pacing = "busy"
+
+        self.window = None  # only when we scale the screen to it ourselves
+        if render_mode == "native":
+            self.screen = pygame.display.set_mode(SCREEN_SIZE, DISPLAY_FLAGS)
+        elif render_mode == "scaled":
+            self.screen = pygame.display.set_mode(
+                BASE_SCREEN_SIZE, DISPLAY_FLAGS | pygame.SCALED | pygame.RESIZABLE,
+                vsync=pacing in ("vsync", "low-latency")
+            )
+        else:
+            self.window = pygame.display.set_mode(self._get_window_size(), DISPLAY_FLAGS | pygame.RESIZABLE)
+            self.screen = pygame.Surface(BASE_SCREEN_SIZE).convert()
+            self.layout_window()
         self.screen_rect = self.screen.get_rect()
 
         self.is_fullscreen = False
 
+        if self.replay:
+            self.replay.check_screen(self.screen_size)
+
         self.screen.set_alpha(None)  # possible performance improvement, remove if troube is caused
 
+        self.dirty_rects = dirty_rects
+        self.background = background
+
         # load the assets
         load_assets(self.screen_size)
+        self.waves = load_waves()
 
         # time
         self.clock = pygame.time.Clock()
+        self.pacing = pacing
+        self.pacer = None  # only in the main loop
 
-        self.loop_time = time.time()
+        self.loop_time = time.time()  # real time
         self.start_time = self.loop_time
 
-        self.delta = 0  # will change after the first loop
+        # the logic runs at a fixed rate, the rendering happens in between
+        self.tick_rate = tick_rate
+        self.tick_time = 1 / tick_rate
+        self.delta = 1000 / tick_rate / GAME_SPEED_INFLUENCER
+
+        self.tick = 0  # number of ticks since the start
+        self.sim_time = 0.0  # simulation time, in seconds
+        self.accumulator = 0.0
+        self.snap_residual = 0.0  # what snapping the frames to ticks took off, see SNAPPED_PACING_MODES
+        self.alpha = 1.0  # where the rendering is between the last two ticks, from 0 to 1
 
         self.is_paused = False
 
+        # only there when profiling, writing to a file or showing the overlay
+        self.profiler = FrameProfiler(self, profile_path) if profile_path else None
+
+        # everything random in the game logic comes from here, so that it can be replayed
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.random = random.Random(self.seed)
+
+        self.score = 0
+        self.recorder = InputRecorder(record_path, self) if record_path else None
+
         # keys
         self.pressed_keys = defaultdict(bool)
 
@@ -67,13 +127,14 @@ class Game:
         if scene_cleanup:
             self.scene.cleanup()
         self.scene = scene
+        self.scene.invalidate()
 
-    def start_new_game(self):
+    def start_new_game(self, waves=None):
         # reset vars
         self.ship = Ship(self)
         self.score = 0
 
-        self.switch_scene(MainScene(self))
+        self.switch_scene(MainScene(self, waves))
 
     def pause_game(self):
         if self.is_paused or isinstance(self.scene, MenuScene):
@@ -82,67 +143,272 @@ class Game:
         self.is_paused = True
         self.switch_scene(PauseScene(self, self.scene), scene_cleanup=False)
 
-    def toggle_fullscreen(self):  # TODO: FIXME
-        if self.is_fullscreen:
-            flags = DISPLAY_FLAGS
-            # self.screen_size = self.screen_width, self.screen_height = SCREEN_SIZE
+    def toggle_fullscreen(self):
+        """
+        The screen keeps its size, only the scaled modes use the whole display.
+        """
+        if self.render_mode == "scaled":
+            flags = DISPLAY_FLAGS | pygame.SCALED | (pygame.RESIZABLE if self.is_fullscreen else pygame.FULLSCREEN)
+            pygame.display.set_mode(BASE_SCREEN_SIZE, flags)  # the same screen, SDL scales it to the new window
+        elif self.render_mode == "integer":
+            if self.is_fullscreen:
+                self.window = pygame.display.set_mode(self._get_window_size(), DISPLAY_FLAGS | pygame.RESIZABLE)
+            else:
+                self.window = pygame.display.set_mode((0, 0), DISPLAY_FLAGS | pygame.FULLSCREEN)
+            self.layout_window()
         else:
-            flags = DISPLAY_FLAGS | pygame.HWSURFACE | pygame.FULLSCREEN
-            # self.screen_size = self.screen_width, self.screen_height = \
-            # self.display_info.current_w, self.display_info.current_h
-
-        self.screen = pygame.display.set_mode(self.screen_size, flags)
-        self.screen_rect = self.screen.get_rect()
+            flags = DISPLAY_FLAGS if self.is_fullscreen else DISPLAY_FLAGS | pygame.HWSURFACE | pygame.FULLSCREEN
+            self.screen = pygame.display.set_mode(self.screen_size, flags)  # the same surface, changed in place
 
         self.is_fullscreen = not self.is_fullscreen
+        self.scene.invalidate()
+
+    def _get_window_size(self):
+        """
+        The size of the integer mode's window, a whole multiple of the screen that fits on the display.
+        """
+        info = self.display_info
+        factor = min(INTEGER_WINDOW_SCALE, info.current_w // self.screen_width, info.current_h // self.screen_height)
+        return self.screen_width * max(1, factor), self.screen_height * max(1, factor)
+
+    def layout_window(self):
+        """
+        Places the scaled screen at the center of the window, as big as a whole factor lets it.
+        A window smaller than the screen shows its center, unscaled.
+        """
+        window = self.window = pygame.display.get_surface()
+        width, height = window.get_size()
+        factor = max(1, min(width // self.screen_width, height // self.screen_height))
+
+        self.window_scale = factor
+        self.window_rect = pygame.Rect(0, 0, self.screen_width * factor, self.screen_height * factor)
+        self.window_rect.center = (width // 2, height // 2)
+        self.window_view = window.subsurface(self.window_rect) if factor > 1 else None  # it fits then
+        window.fill(BLACK)
+        self.window_changed = True  # all of it needs to be shown again
+
+    def present(self, rects=None):
+        """
+        Shows what was drawn on the screen, only in the rects if there are any.
+        """
+        if self.window is None:  # the screen is the window, SDL scales it if needed
+            if rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(rects)
+            return
+
+        factor = self.window_scale
+        left, top = self.window_rect.topleft
+        if rects is None or self.window_changed:
+            if factor > 1:
+                pygame.transform.scale(self.screen, self.window_rect.size, self.window_view)
+            else:
+                self.window.blit(self.screen, (left, top))  # clipped if the window is smaller
+            pygame.display.flip()
+            self.window_changed = False
+            return
+
+        if factor == 1:
+            pygame.display.update(self.window.blits(
+                [(self.screen, (left + rect[0], top + rect[1]), rect) for rect in rects], doreturn=True
+            ))
+            return
+
+        updated = []
+        for rect in rects:
+            rect = self.screen_rect.clip(rect)
+            if rect:
+                dest = pygame.Rect(rect.x * factor, rect.y * factor, rect.w * factor, rect.h * factor)
+                pygame.transform.scale(self.screen.subsurface(rect), dest.size, self.window_view.subsurface(dest))
+                updated.append(dest.move(left, top))
+        pygame.display.update(updated)
+
+    def to_screen_pos(self, pos):
+        """
+        Returns where a position in the window is on the screen.
+        """
+        if self.window is None:
+            return pos
+        x, y = pos
+        return (x - self.window_rect.x) // self.window_scale, (y - self.window_rect.y) // self.window_scale
+
+    def toggle_profiler(self):
+        if self.profiler is None:
+            self.profiler = FrameProfiler(self)
+        elif self.profiler.visible and not self.profiler.file:
+            self.profiler = None  # nothing else needs it
+            return
+
+        self.profiler.toggle_overlay()
 
     def stop(self):
         log.info("Quitting")
         raise Stop("it's time to stop")
 
-    def mainloop(self):
-        while True:
-            self.loop_time = time.time()
+    def process_events(self):
+        events = pygame.event.get()
+        if self.pacer:
+            self.pacer.polled(events)
+        if self.replay:
+            if self.replay.is_finished(self.tick):
+                self.replay.check(self)
+                self.stop()
+            events = self.replay.get_events(self.tick, events)
+        if self.recorder:
+            self.recorder.record(self.tick, events)
 
-            # event processing
-            for event in pygame.event.get():  # NOTE: check BOCKED_EVENTS before messing with new events
+        for event in events:  # NOTE: check BOCKED_EVENTS before messing with new events
 
-                if event.type == pygame.QUIT:
-                    self.stop()
+            if event.type == pygame.QUIT:
+                self.stop()
 
-                elif event.type == pygame.MOUSEMOTION:
-                    self.last_movement = self.loop_time
-                    pygame.mouse.set_visible(True)
+            elif event.type == pygame.MOUSEMOTION:
+                self.last_movement = self.loop_time
+                pygame.mouse.set_visible(True)
+                event.pos = self.to_screen_pos(event.pos)
 
-                elif event.type == pygame.KEYUP:
-                    self.pressed_keys[event.key] = False
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                event.pos = self.to_screen_pos(event.pos)
 
-                elif event.type == pygame.KEYDOWN:
-                    self.pressed_keys[event.key] = True
+            elif event.type == pygame.VIDEORESIZE:
+                if self.window is not None:
+                    self.layout_window()
+                self.scene.invalidate()
 
-                    if event.key == PAUSE_KEY and not self.is_paused:
-                        self.pause_game()
-                        continue  # we don't want the pause scene to catch this event
+            elif event.type == pygame.KEYUP:
+                self.pressed_keys[event.key] = False
 
-                    elif event.key == FULLSCREEN_KEY:
-                        self.pause_game()
-                        self.toggle_fullscreen()
+            elif event.type == pygame.KEYDOWN:
+                self.pressed_keys[event.key] = True
 
-                elif event.type == DEATH_EVENT:
-                    self.switch_scene(DeathScene(self, self.scene), scene_cleanup=False)
+                if event.key == PAUSE_KEY and not self.is_paused:
+                    self.pause_game()
+                    continue  # we don't want the pause scene to catch this event
 
-                self.scene.process_event(event)
+                elif event.key == FULLSCREEN_KEY:
+                    self.pause_game()
+                    self.toggle_fullscreen()
 
-            if (self.loop_time - self.last_movement) > MOUSE_VISIBLE_TIME:
-                self.last_movement = -self.loop_time
-                pygame.mouse.set_visible(False)
+                elif event.key == PROFILER_KEY:
+                    self.toggle_profiler()
 
-            # main logic
-            self.scene.update()
-            self.scene.clear_screen()
-            self.scene.draw()
+            elif event.type == DEATH_EVENT:
+                self.switch_scene(DeathScene(self, self.scene), scene_cleanup=False)
 
-            self.scene.update_screen()
+            self.scene.process_event(event)
 
-            # tick-tock-tick-tock...
-            self.delta = self.clock.tick(BASE_FPS) / GAME_SPEED_INFLUENCER
+        if (self.loop_time - self.last_movement) > MOUSE_VISIBLE_TIME:
+            self.last_movement = -self.loop_time
+            pygame.mouse.set_visible(False)
+
+    def step(self):
+        """
+        Runs one fixed tick of the game logic.
+        """
+        profiler = self.profiler
+
+        self.process_events()
+        if profiler:
+            profiler.mark(EVENTS)
+
+        self.scene.update()
+        if profiler:
+            profiler.mark(UPDATE)
+            profiler.ticks += 1
+
+        self.tick += 1
+        self.sim_time += self.tick_time
+
+    def mainloop(self):
+        self.pacer = Pacer(self.clock, self.pacing)
+        self.clock.tick()
+        try:
+            while True:
+                self.loop_time = time.time()
+
+                # main logic, as many ticks as the time since the last frame needs
+                while self.accumulator >= self.tick_time:
+                    self.step()
+                    self.accumulator -= self.tick_time
+                self.alpha = self.accumulator / self.tick_time
+
+                # rendering
+                profiler = self.profiler  # the events might have toggled it
+                self.scene.clear_screen()
+                if profiler:
+                    profiler.mark(CLEAR)
+
+                self.scene.draw()
+                if profiler:
+                    profiler.mark(DRAW)
+                    if profiler.visible:
+                        self.scene.to_update.append(profiler.draw(self.screen))
+                    profiler.mark(OVERLAY)
+
+                self.pacer.rendered()
+                self.scene.update_screen()
+                self.pacer.presented()
+                if profiler:
+                    profiler.mark(UPDATE_SCREEN)
+
+                # tick-tock-tick-tock...
+                elapsed = self.pacer.wait() / 1000
+                if self.pacing in SNAPPED_PACING_MODES:
+                    # the difference is carried to the next frames, the simulation keeps up with the real time
+                    elapsed += self.snap_residual
+                    if abs(elapsed - self.tick_time) < PACING_SNAP:
+                        self.snap_residual = elapsed - self.tick_time
+                        elapsed = self.tick_time
+                    else:
+                        self.snap_residual = 0.0
+                self.accumulator += elapsed
+                self.accumulator = min(self.accumulator, self.tick_time * MAX_TICKS_PER_FRAME)
+                if profiler:
+                    profiler.mark(TICK)
+                    profiler.end_frame()
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Finishes writing the recordings, if any, and logs how the frames were paced.
+        """
+        if self.pacer:
+            self.pacer.log_stats()
+        if self.profiler:
+            self.profiler.close()
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+
+    def run_headless(self, frames):
+        """
+        Starts a new game and steps its logic as fast as possible, without drawing anything,
+        until the frames have been simulated or our ship dies.
+        Returns the number of simulated frames and the simulated frames per wall-clock second.
+        """
+        self.start_new_game()
+
+        frame = 0
+        start = time.perf_counter()
+        for frame in range(1, frames + 1):
+            self.step()
+            if isinstance(self.scene, DeathScene):
+                break
+
+        elapsed = time.perf_counter() - start
+        return frame, frame / elapsed
+
+    def run_replay(self):
+        """
+        Steps the logic of the replay as fast as possible, without drawing anything.
+        Returns the number of simulated frames and the simulated frames per wall-clock second.
+        """
+        start = time.perf_counter()
+        while not self.replay.is_finished(self.tick):
+            self.step()
+
+        elapsed = time.perf_counter() - start
+        self.replay.check(self)
+        return self.tick, self.tick / elapsed
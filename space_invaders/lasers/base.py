@@ -1,7 +1,9 @@
+import functools
+
 import pygame
 
-from ..assets import get_sprite
-from ..base import BaseSprite
+from ..assets import SpriteHandle, get_mask
+from ..base import PooledSprite
 from ..constants import (BASE_SCREEN_SIZE, DEFAULT_LASER_DAMAGE,
                          DEFAULT_LASER_SPEED)
 
@@ -12,11 +14,12 @@ class BaseLaserTeam:
 
 def get_friendly_laser(laser):
     class FriendlyLaser(laser, BaseLaserTeam):
-        def move(self):
-            self.rect.y -= (self.speed * self.game.screen_height / BASE_SCREEN_SIZE[1]) * self.game.delta
+        @property
+        def velocity(self):
+            return 0, -self.speed * self.game.screen_height / BASE_SCREEN_SIZE[1]
 
         def is_colliding(self):
-            collisions = pygame.sprite.spritecollide(self, self.scene.enemi_ships, False)
+            collisions = self.scene.enemi_grid.collide(self)
             if collisions and pygame.sprite.spritecollideany(self, collisions, pygame.sprite.collide_mask):
                 [c.on_collision(self.damage) for c in collisions]
                 return True
@@ -27,12 +30,14 @@ def get_friendly_laser(laser):
 
 def get_enemi_laser(laser):
     class EnemiLaser(laser, BaseLaserTeam):
-        def move(self):
-            self.rect.y += (self.speed * self.game.screen_height / BASE_SCREEN_SIZE[1]) * self.game.delta
+        sprite = SpriteHandle("lasers", "enemi-" + laser.image_name)
+
+        @property
+        def velocity(self):
+            return 0, self.speed * self.game.screen_height / BASE_SCREEN_SIZE[1]
 
         def is_colliding(self):
-            collision = pygame.sprite.spritecollide(self, [self.game.ship], False)
-            if pygame.sprite.spritecollideany(self, collision, pygame.sprite.collide_mask):
+            if self.scene.collide_ship(self):
                 self.game.ship.on_collision(self.damage)
                 return True
             return False
@@ -40,27 +45,45 @@ def get_enemi_laser(laser):
     return EnemiLaser
 
 
-class BaseLaser(BaseSprite):
+@functools.lru_cache(None)
+def get_team_laser(laser, is_enemi):
+    """
+    Returns the team class of a laser type, it is only built once per (laser type, team).
+    """
+    if is_enemi:
+        return get_enemi_laser(laser)
+    return get_friendly_laser(laser)
+
+
+class BaseLaser(PooledSprite):
+    sprite_dir = "lasers"
+
     def __init__(self, game, scene, original_position):
         super().__init__(game)
-        self.image = get_sprite(
-            "lasers",
-            ("enemi-" if self.__class__.__name__.startswith("Enemi") else "") + self._get_image_name()
-        )  # TODO: change
+        self.image = self.sprite.get()
+        self.mask = get_mask(self.image)
 
         self.scene = scene
 
-        self.rect = self.image.get_rect(center=original_position)
+        self.rect = self.image.get_rect()
+        self.place(center=original_position)
 
         # defaults
         self.set_default("speed", DEFAULT_LASER_SPEED)
         self.set_default("damage", DEFAULT_LASER_DAMAGE)
 
-    def _get_image_name(self):  # its a TODO, ofc
-        return self.image_name
+    def reset(self, original_position):
+        self.place(center=original_position)
+
+    @property
+    def velocity(self):
+        return 0, 0
+
+    def add_entity(self, store):
+        self.slot = store.add(self, *self.velocity, culled=True)
 
     def move(self):
-        pass
+        self.y += self.velocity[1] * self.game.delta
 
     def is_colliding(self):
         return False
@@ -70,12 +93,9 @@ class BaseLaser(BaseSprite):
         if (not self.rect.colliderect(self.game.screen_rect)) or self.is_colliding():
             self.kill()
 
-        self.move()
+        if self.slot is None:  # otherwise, the entity store moves it
+            self.move()
 
     @classmethod
     def create(cls, game, scene, original_position, is_enemi):
-        if is_enemi:
-            laser = get_enemi_laser(cls)
-        else:
-            laser = get_friendly_laser(cls)
-        return laser(game, scene, original_position)
+        return scene.pool.acquire(get_team_laser(cls, is_enemi), original_position)
@@ -0,0 +1,123 @@
+import logging
+import statistics
+import time
+from collections import deque
+
+import pygame
+
+from .constants import BASE_FPS, LOW_LATENCY_MARGIN, PACING_HISTORY
+from .profiler import PERCENTILES, percentile
+
+log = logging.getLogger(__name__)
+
+SPIN_TIME = 0.002  # the end of a precise wait is spun, sleeping isn't precise enough
+
+
+class Pacer:
+    """
+    Waits between the frames of the main loop, according to its mode.
+    It also measures, in milliseconds, the intervals between the frames being shown and the latency
+    from a key press to the first frame showing its effect. A key press is counted from halfway between
+    the two reads of the events around it, pygame doesn't tell when it happened.
+    """
+    def __init__(self, clock, mode):
+        self.clock = clock
+        self.mode = mode
+        self.period = 1 / BASE_FPS
+
+        self.intervals = deque(maxlen=PACING_HISTORY)
+        self.latencies = deque(maxlen=PACING_HISTORY)
+        self.pressed = []  # when the key presses not shown yet happened
+
+        now = time.perf_counter()
+        self.last_poll = now
+        self.last_present = now
+        self.frame_start = now
+        self.work = 0.0  # smoothed time from the start of a frame to it being ready to be shown, in seconds
+        self.due = now  # when the next low-latency frame should be shown
+
+    def polled(self, events):
+        """
+        Called with the events that were just read.
+        """
+        now = time.perf_counter()
+        if any(event.type == pygame.KEYDOWN for event in events):
+            self.pressed.append((self.last_poll + now) / 2)
+        self.last_poll = now
+
+    def rendered(self):
+        """
+        Called once the frame is drawn, before showing it. Showing it isn't counted in the work,
+        with vsync it waits for the display and the low-latency frames would start earlier and earlier.
+        """
+        self.work += (time.perf_counter() - self.frame_start - self.work) / 10
+
+    def presented(self):
+        """
+        Called once the frame is shown.
+        """
+        now = time.perf_counter()
+        self.intervals.append((now - self.last_present) * 1000)
+        if self.pressed:
+            self.latencies.extend((now - pressed) * 1000 for pressed in self.pressed)
+            self.pressed.clear()
+        self.last_present = now
+
+    def wait(self):
+        """
+        Waits until the next frame should start, returns the time since the last one started in ms.
+        """
+        mode = self.mode
+        if mode == "tick":
+            ms = self.clock.tick(BASE_FPS)
+        elif mode == "busy":
+            ms = self.clock.tick_busy_loop(BASE_FPS)
+        else:
+            if mode == "low-latency":
+                # due a period after the last one (with vsync, it was shown at a refresh), or after it was late
+                self.due = max(self.due, self.last_present) + self.period
+                self._sleep_until(self.due - self.work - LOW_LATENCY_MARGIN / 1000)
+            ms = self.clock.tick()  # with vsync, showing the frame waited already
+
+        self.frame_start = time.perf_counter()
+        return ms
+
+    @staticmethod
+    def _sleep_until(end):
+        remaining = end - time.perf_counter()
+        if remaining > SPIN_TIME:
+            time.sleep(remaining - SPIN_TIME)
+        while time.perf_counter() < end:
+            pass
+
+    def stats(self):
+        """
+        Returns the percentiles of the frame intervals and of the latencies, the jitter
+        (standard deviation of the intervals) and the share of frames shown more than half a period late.
+        """
+        intervals = sorted(self.intervals)
+        latencies = sorted(self.latencies)
+        late = self.period * 1000 * 1.5
+        return {
+            "frames": len(intervals),
+            "interval": [percentile(intervals, p) for p in PERCENTILES] if intervals else None,
+            "jitter": statistics.pstdev(intervals) if intervals else None,
+            "missed": sum(interval > late for interval in intervals) / len(intervals) if intervals else None,
+            "presses": len(latencies),
+            "latency": [percentile(latencies, p) for p in PERCENTILES] if latencies else None
+        }
+
+    def log_stats(self):
+        stats = self.stats()
+        if not stats["frames"]:
+            return
+
+        def fmt(values):
+            return ", ".join(f"p{p} {value:.1f}" for p, value in zip(PERCENTILES, values))
+
+        log.info(
+            f"Pacing {self.mode}: frame intervals {fmt(stats['interval'])} ms, jitter {stats['jitter']:.2f} ms, "
+            f"{stats['missed']:.1%} missed over {stats['frames']} frames"
+        )
+        if stats["presses"]:
+            log.info(f"Key press to display latency: {fmt(stats['latency'])} ms over {stats['presses']} presses")
@@ -0,0 +1,53 @@
+import logging
+from collections import Counter, defaultdict
+
+from .constants import POOL_MAX_SIZE
+
+log = logging.getLogger(__name__)
+
+
+class SpritePool:
+    """
+    Keeps killed sprites around so they can be reused instead of reallocated.
+    Pooled sprites must have a reset method taking the same arguments
+    as their constructor, minus the game and the scene.
+    """
+    def __init__(self, game, scene, max_size=POOL_MAX_SIZE):
+        self.game = game
+        self.scene = scene
+        self.max_size = max_size
+
+        self.free = defaultdict(list)
+
+        # counters, per sprite type
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def acquire(self, sprite_type, *args):
+        free = self.free[sprite_type]
+        if free:
+            self.hits[sprite_type] += 1
+            sprite = free.pop()
+            sprite.reset(*args)
+            return sprite
+
+        self.misses[sprite_type] += 1
+        return sprite_type(self.game, self.scene, *args)
+
+    def release(self, sprite):
+        free = self.free[type(sprite)]
+        if len(free) < self.max_size:
+            free.append(sprite)
+
+    def stats(self):
+        return {
+            sprite_type.__name__: {
+                "hits": self.hits[sprite_type],
+                "misses": self.misses[sprite_type],
+                "free": len(self.free[sprite_type])
+            } for sprite_type in self.hits.keys() | self.misses.keys()
+        }
+
+    def clear(self):
+        log.debug(f"Pool stats: {self.stats()}")
+        self.free.clear()
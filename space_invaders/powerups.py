@@ -1,25 +1,29 @@
-import pygame
-
-from .assets import get_sprite
-from .base import BaseSprite
+from .assets import get_mask
+from .base import PooledSprite
 from .constants import BASE_SCREEN_SIZE
 
 
-class BasePowerup(BaseSprite):
+class BasePowerup(PooledSprite):
+    sprite_dir = "powerups"
+
     def __init__(self, game, scene, pos):
         super().__init__(game)
 
-        self.image = get_sprite("powerups", self.image_name)
-        self.rect = self.image.get_rect(center=pos)
+        self.image = self.sprite.get()
+        self.mask = get_mask(self.image)
+        self.rect = self.image.get_rect()
+        self.place(center=pos)
 
         self.scene = scene
 
+    def reset(self, pos):
+        self.place(center=pos)
+
     def action(self, target):
         pass
 
     def is_colliding(self):
-        collision = pygame.sprite.spritecollide(self, [self.game.ship], False)
-        if pygame.sprite.spritecollideany(self, collision, pygame.sprite.collide_mask):
+        if self.scene.collide_ship(self):
             self.action(self.game.ship)
             return True
         return False
@@ -30,7 +34,7 @@ class BasePowerup(BaseSprite):
             self.kill()
 
         # now we move it down
-        self.rect.y += (self.speed * self.game.screen_height / BASE_SCREEN_SIZE[1]) * self.game.delta
+        self.y += (self.speed * self.game.screen_height / BASE_SCREEN_SIZE[1]) * self.game.delta
 
 
 class BaseHealthBoost(BasePowerup):
@@ -0,0 +1,159 @@
+import json
+import logging
+import time
+from collections import deque
+
+import pygame
+
+from .assets import pixeled
+from .constants import (BASE_FPS, BLACK, BLUE, GREEN,
+                        PROFILER_GRAPH_SIZE, PROFILER_HISTORY,
+                        PROFILER_REFRESH, RED, WHITE)
+
+log = logging.getLogger(__name__)
+
+# the phases of a frame, in the order they happen in the main loop
+PHASES = ("events", "update", "clear", "draw", "overlay", "update_screen", "tick")
+EVENTS, UPDATE, CLEAR, DRAW, OVERLAY, UPDATE_SCREEN, TICK = range(len(PHASES))
+
+PHASE_COLORS = (
+    pygame.Color(255, 165, 0), GREEN, pygame.Color(128, 128, 128), BLUE,
+    pygame.Color(200, 0, 200), RED, pygame.Color(60, 60, 60)
+)
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values, p):
+    """
+    Nearest-rank percentile of sorted values.
+    """
+    return values[min(len(values) - 1, round(p / 100 * (len(values) - 1)))]
+
+
+class FrameProfiler:
+    """
+    Times the phases of every frame of the main loop, in milliseconds.
+    The main loop marks the end of each phase, what happened since the last mark is counted in it.
+    """
+    def __init__(self, game, path=None, history=PROFILER_HISTORY):
+        self.game = game
+
+        self.frames = deque(maxlen=history)  # (phase times, total) of the last frames
+        self.times = [0.0] * len(PHASES)  # of the current frame
+        self.ticks = 0
+        self.frame = 0
+        self.last = time.perf_counter()
+
+        self.file = open(path, "w", encoding="utf-8") if path else None
+
+        self.visible = False
+        self.text = None  # the percentiles
+        self.graph = None  # the frame times, scrolled by one bar every frame
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.times[phase] += (now - self.last) * 1000
+        self.last = now
+
+    def end_frame(self):
+        times = self.times
+        total = sum(times)
+        self.frames.append((times, total))
+
+        if self.file:
+            record = {"frame": self.frame, "scene": type(self.game.scene).__name__, "ticks": self.ticks}
+            record.update(zip(PHASES, (round(t, 4) for t in times)))
+            record["total"] = round(total, 4)
+            self.file.write(json.dumps(record) + "\n")
+
+        if self.visible:
+            self._add_bar(times)
+            if self.frame % PROFILER_REFRESH == 0:
+                self.text = None
+
+        self.times = [0.0] * len(PHASES)
+        self.ticks = 0
+        self.frame += 1
+
+    def stats(self):
+        """
+        Returns the percentiles of the time of each phase, and of the whole frame, over the last frames.
+        """
+        stats = {}
+        for i, phase in enumerate(PHASES):
+            values = sorted(times[i] for times, _ in self.frames)
+            stats[phase] = [percentile(values, p) for p in PERCENTILES]
+        totals = sorted(total for _, total in self.frames)
+        stats["total"] = [percentile(totals, p) for p in PERCENTILES]
+        return stats
+
+    def toggle_overlay(self):
+        self.visible = not self.visible
+        self.text = None
+        if not self.visible:
+            self.graph = None
+            return
+
+        scale = self.game.scale
+        self.graph = pygame.Surface((round(PROFILER_GRAPH_SIZE[0] * scale), round(PROFILER_GRAPH_SIZE[1] * scale)))
+        self.graph.fill(BLACK)
+        self.graph.set_alpha(200)
+        for times, _ in self.frames:
+            self._add_bar(times)
+
+    def _add_bar(self, times):
+        # the times are stacked by phase, the line is the time budget of a frame
+        graph = self.graph
+        width, height = graph.get_size()
+        bar_width = max(1, width // self.frames.maxlen)
+        scale = height / (1000 / BASE_FPS * 2)
+
+        graph.scroll(-bar_width)
+        x = width - bar_width
+        graph.fill(BLACK, (x, 0, bar_width, height))
+
+        y = height
+        for time_, color in zip(times, PHASE_COLORS):
+            bar_height = time_ * scale
+            if bar_height >= 0.5:
+                graph.fill(color, (x, round(y - bar_height), bar_width, round(bar_height)))
+            y -= bar_height
+        graph.fill(WHITE, (x, height // 2, bar_width, 1))
+
+    def _render_text(self):
+        # not in the text cache, the numbers hardly ever repeat
+        font = pixeled(self.game.font_size / 2)
+        lines = [font.render("phase    " + "  ".join(f"p{p:<4}" for p in PERCENTILES), False, WHITE)]
+        if self.frames:
+            for i, (phase, values) in enumerate(self.stats().items()):
+                color = PHASE_COLORS[i] if i < len(PHASES) else WHITE
+                line = f"{phase[:8]:<8} " + "  ".join(f"{value:5.1f}" for value in values)
+                lines.append(font.render(line, False, color))
+
+        line_height = lines[0].get_height()
+        surf = pygame.Surface((
+            max(self.graph.get_width(), *(line.get_width() for line in lines)),
+            line_height * len(lines)
+        ))
+        surf.fill(BLACK)
+        surf.set_alpha(200)
+        surf.blits((line, (0, i * line_height)) for i, line in enumerate(lines))
+        return surf
+
+    def draw(self, surface):
+        """
+        Draws the overlay at the top right of the surface, returns the drawn region.
+        """
+        if self.text is None:
+            self.text = self._render_text()
+
+        text_rect = self.text.get_rect(topright=(surface.get_width(), 0))
+        graph_rect = self.graph.get_rect(topright=text_rect.bottomright)
+        surface.blits(((self.text, text_rect), (self.graph, graph_rect)))
+        return text_rect.union(graph_rect)
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+            log.info(f"Wrote the profile of {self.frame} frames")
@@ -0,0 +1,35 @@
+from itertools import chain
+
+# the layers of a frame, drawn in this order
+LAYERS = ("player", "lasers", "enemi_ships", "powerups", "hud")
+PLAYER, LASERS, ENEMI_SHIPS, POWERUPS, HUD = range(len(LAYERS))
+
+
+class RenderQueue:
+    """
+    Gathers the (image, position) pairs drawn during a frame, by layer, and draws them all
+    with a single blits call. What is off the surface is culled before being queued.
+    Groups can append to the layers directly, if they do the culling themselves (see InterpolatedGroup.queue).
+    """
+    def __init__(self, surface):
+        self.surface = surface
+        self.size = surface.get_size()
+        self.layers = [[] for _ in LAYERS]
+
+    def add(self, image, pos, layer):
+        x, y = pos
+        width, height = self.size
+        if x < width and y < height and x + image.get_width() > 0 and y + image.get_height() > 0:
+            self.layers[layer].append((image, pos))
+
+    def __len__(self):
+        return sum(len(layer) for layer in self.layers)
+
+    def flush(self, doreturn=False):
+        """
+        Draws everything and empties the queue, returns the drawn rects if doreturn is true.
+        """
+        rects = self.surface.blits(chain.from_iterable(self.layers), doreturn=doreturn)
+        for layer in self.layers:
+            layer.clear()
+        return rects
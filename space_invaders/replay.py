@@ -0,0 +1,122 @@
+import logging
+import struct
+
+import pygame
+
+from .constants import DEATH_EVENT, ENTITY_STORE
+from .entities import np
+
+log = logging.getLogger(__name__)
+
+# the file: a header, then a record per event, the tick of a record is relative to the previous one
+REPLAY_MAGIC = b"SIRP"
+REPLAY_VERSION = 3  # bump when the format changes, or when the game logic does
+REPLAY_HEADER = struct.Struct("<4sBIHHHB")  # magic, version, seed, tick rate, screen size, flags
+REPLAY_RECORD = struct.Struct("<HBi")  # ticks since the last record, kind, key (or score for the end)
+
+# record kinds
+KEYUP, KEYDOWN, DEATH, WAIT, END = range(5)
+EVENT_KINDS = {pygame.KEYUP: KEYUP, pygame.KEYDOWN: KEYDOWN, DEATH_EVENT: DEATH}
+KIND_EVENTS = {kind: event_type for event_type, kind in EVENT_KINDS.items()}
+
+USES_ENTITY_STORE = 1  # flag, the store moves things slightly differently
+
+
+def _get_flags():
+    return USES_ENTITY_STORE if ENTITY_STORE and np is not None else 0
+
+
+class ReplayError(Exception):
+    pass
+
+
+class InputRecorder:
+    """
+    Writes the events that drive the game logic, with the tick they were processed at.
+    The rest comes from the game's seed, so replaying the events gives back the same game.
+    """
+    def __init__(self, path, game):
+        self.game = game
+        self.last_tick = 0
+
+        self.file = open(path, "wb")
+        self.file.write(REPLAY_HEADER.pack(
+            REPLAY_MAGIC, REPLAY_VERSION, game.seed, game.tick_rate, *game.screen_size, _get_flags()
+        ))
+
+    def _write(self, tick, kind, value=0):
+        delta = tick - self.last_tick
+        while delta > 0xffff:
+            self.file.write(REPLAY_RECORD.pack(0xffff, WAIT, 0))
+            delta -= 0xffff
+        self.file.write(REPLAY_RECORD.pack(delta, kind, value))
+        self.last_tick = tick
+
+    def record(self, tick, events):
+        for event in events:
+            kind = EVENT_KINDS.get(event.type)
+            if kind is not None:
+                self._write(tick, kind, getattr(event, "key", 0))
+
+    def close(self):
+        self._write(self.game.tick, END, self.game.score)
+        self.file.close()
+        log.info(f"Recorded {self.game.tick} ticks")
+
+
+class InputReplay:
+    """
+    Plays recorded events back, in place of the real ones.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+
+        try:
+            magic, version, self.seed, self.tick_rate, width, height, flags = REPLAY_HEADER.unpack_from(data)
+        except struct.error:
+            raise ReplayError(f"{path} is not a replay") from None
+        if magic != REPLAY_MAGIC:
+            raise ReplayError(f"{path} is not a replay")
+        if version != REPLAY_VERSION:
+            raise ReplayError(f"{path} was recorded by another version of the game")
+        if flags != _get_flags():
+            raise ReplayError(f"{path} was recorded with other settings, it can't be replayed here")
+        self.path = path
+        self.screen_size = (width, height)
+
+        self.events = {}  # tick -> events
+        self.end = self.score = None
+        tick = 0
+        for delta, kind, value in REPLAY_RECORD.iter_unpack(data[REPLAY_HEADER.size:]):
+            tick += delta
+            if kind == END:
+                self.end = tick
+                self.score = value
+            elif kind != WAIT:
+                event = pygame.event.Event(KIND_EVENTS[kind], key=value) if kind != DEATH else \
+                    pygame.event.Event(DEATH_EVENT)
+                self.events.setdefault(tick, []).append(event)
+
+        if self.end is None:
+            raise ReplayError(f"{path} is truncated")
+
+    def check_screen(self, screen_size):
+        if screen_size != self.screen_size:
+            width, height = self.screen_size
+            raise ReplayError(f"{self.path} was recorded at {width}x{height}, replay it with the same render mode")
+
+    def is_finished(self, tick):
+        return tick >= self.end
+
+    def get_events(self, tick, events):
+        """
+        Returns the events of a tick, the recorded ones replace the real events of the same kinds.
+        """
+        return self.events.get(tick, []) + [event for event in events if event.type not in EVENT_KINDS]
+
+    def check(self, game):
+        if game.score != self.score:
+            log.warning(f"The replay diverged, the score is {game.score} instead of {self.score}")
+        else:
+            log.info(f"Replayed {self.end} ticks, the score matches ({self.score})")
@@ -1,10 +1,10 @@
-import functools
-
 import pygame
 
-from ..constants import (BLACK, FONT_SIZE, PAUSE_KEY, RESTART_KEY, START_KEY,
+from ..constants import (BLACK, PAUSE_KEY, RESTART_KEY, START_KEY,
                          WINDOW_TITLE)
-from .base import MenuSceneContext, MenuSceneNoContext
+from ..text import get_text, prerender
+from .base import (BLINK_OPACITIES, RESIZE_SCALES, MenuSceneContext,
+                   MenuSceneNoContext)
 
 
 class WelcomeScene(MenuSceneNoContext):
@@ -22,6 +22,9 @@ class WelcomeScene(MenuSceneNoContext):
             "Quit", self.game.stop
         )
 
+        prerender(WINDOW_TITLE, self.game.font_size * 4, scales=RESIZE_SCALES)
+        prerender("Press ENTER to play", self.game.font_size, BLINK_OPACITIES)
+
     def process_event(self, event):
         super().process_event(event)
 
@@ -36,27 +39,15 @@ class WelcomeScene(MenuSceneNoContext):
         else:
             self.screen.fill(BLACK)
 
-    def cleanup(self):
-        self._get_main_text.cache_clear()
-
-    @functools.lru_cache()
-    def _get_main_text(self, size_mod):
-        main_text = self.get_text(WINDOW_TITLE, (FONT_SIZE * 4))
-        main_text = pygame.transform.smoothscale(main_text, (
-            round(main_text.get_width() * (size_mod / 100)),
-            round(main_text.get_height() * (size_mod / 100))
-        ))
-        return main_text
-
     def draw(self):
         super().draw()
 
-        main_text = self._get_main_text(self.size_mod)
+        main_text = get_text(WINDOW_TITLE, self.game.font_size * 4, scale=self.size_mod)
         main_txt_rect = main_text.get_rect(center=(
             self.screen_rect.center[0],
             self.screen_rect.center[1] / 2.5
         ))
-        play_text = self.get_text("Press ENTER to play", FONT_SIZE, opacity=self.opacity)
+        play_text = get_text("Press ENTER to play", self.game.font_size, opacity=self.opacity)
         play_txt_rect = play_text.get_rect(center=(self.screen_rect.center))
 
         self.screen.blits(((main_text, main_txt_rect), (play_text, play_txt_rect)))
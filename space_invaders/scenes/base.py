@@ -2,11 +2,16 @@ import operator
 
 import pygame
 
-from ..assets import pixeled
 from ..constants import (
-    BLACK, FONT_SIZE, TEXT_BLINK_SPEED, TEXT_RESIZE_SPEED, WHITE)
+    BLACK, TEXT_BLINK_SPEED, TEXT_MIN_OPACITY, TEXT_OPACITY_STEP,
+    TEXT_RESIZE_SPEED, TEXT_SCALE_STEP, TEXT_SIZE_RANGE)
+from ..text import get_text, prerender
 from ..ui import Button
 
+# the frames of the blinking and resizing effects
+BLINK_OPACITIES = range(TEXT_MIN_OPACITY, 256, TEXT_OPACITY_STEP)
+RESIZE_SCALES = range(TEXT_SIZE_RANGE[0], TEXT_SIZE_RANGE[1] + 1, TEXT_SCALE_STEP)
+
 
 class BaseScene:
     def __init__(self, game):
@@ -14,9 +19,17 @@ class BaseScene:
         self.screen = game.screen
         self.screen_rect = game.screen_rect
 
+        self.to_update = []  # regions of the screen drawn during this frame
+
     def cleanup(self):
         pass
 
+    def invalidate(self):
+        """
+        Called when the scene becomes the current one, the whole screen needs to be redrawn.
+        """
+        pass
+
     def process_event(self, event):
         pass
 
@@ -30,7 +43,7 @@ class BaseScene:
         pass
 
     def update_screen(self):
-        pygame.display.flip()
+        self.game.present()
 
 
 class MenuScene(BaseScene):
@@ -48,24 +61,6 @@ class MenuScene(BaseScene):
         # ui elements
         self.ui_elements = []
 
-        # regions to update
-        self.to_update = []
-
-    def get_text(self, text, size, color=WHITE, opacity=255, antialias=True):
-        font = pixeled(size)
-
-        rendered_text = font.render(text, antialias, WHITE)
-
-        if opacity != 255:
-            surf = pygame.Surface(rendered_text.get_size())
-            surf.blit(rendered_text, (0, 0))
-            surf.set_colorkey(BLACK)
-            surf.set_alpha(opacity)
-        else:
-            surf = rendered_text
-
-        return surf
-
     def add_button(self, pos, size, text, func):
         b = Button(self, pos, size, text, func)
         self.ui_elements.append(b)
@@ -80,15 +75,15 @@ class MenuScene(BaseScene):
             elem.update()
 
         self.opacity = self.opacity_op(self.opacity, TEXT_BLINK_SPEED * self.game.delta)
-        if self.opacity <= 50:
+        if self.opacity <= TEXT_MIN_OPACITY:
             self.opacity_op = operator.add
         elif self.opacity >= 255:
             self.opacity_op = operator.sub
 
         self.size_mod = self.size_op(self.size_mod, TEXT_RESIZE_SPEED * self.game.delta)
-        if self.size_mod <= 85:
+        if self.size_mod <= TEXT_SIZE_RANGE[0]:
             self.size_op = operator.add
-        elif self.size_mod >= 105:
+        elif self.size_mod >= TEXT_SIZE_RANGE[1]:
             self.size_op = operator.sub
 
     def draw(self):
@@ -96,7 +91,7 @@ class MenuScene(BaseScene):
             elem.draw()
 
     def update_screen(self):
-        pygame.display.update(self.to_update)
+        self.game.present(self.to_update)
         self.to_update.clear()
 
 
@@ -122,6 +117,9 @@ class MenuSceneContext(MenuScene):
 
         self.dark_screen = self.screen.copy()
 
+        prerender(self.text, self.game.font_size * 2, BLINK_OPACITIES)
+        prerender(self.bottom_text, self.game.font_size / 1.5, [opacity / 1.5 for opacity in BLINK_OPACITIES])
+
     def clear_screen(self):
         if self.to_update:
             for update in self.to_update:
@@ -132,13 +130,13 @@ class MenuSceneContext(MenuScene):
     def draw(self):
         super().draw()
 
-        text = self.get_text(self.text, FONT_SIZE * 2, opacity=self.opacity)
+        text = get_text(self.text, self.game.font_size * 2, opacity=self.opacity)
         text_rect = text.get_rect(center=(self.screen_rect.center))
 
-        bottom_text = self.get_text(self.bottom_text, FONT_SIZE / 1.5, opacity=self.opacity / 1.5)
+        bottom_text = get_text(self.bottom_text, self.game.font_size / 1.5, opacity=self.opacity / 1.5)
         rect = bottom_text.get_rect(center=(
             self.screen_rect.center[0],
-            self.screen_rect.center[1] + FONT_SIZE * 3  # kinda hacky imo, might change later
+            self.screen_rect.center[1] + self.game.font_size * 3  # kinda hacky imo, might change later
         ))
         self.screen.blits(((text, text_rect), (bottom_text, rect)))
 
@@ -1,20 +1,24 @@
 import functools
 import logging
 import math
-import queue
-import random
-from collections import Counter
 from itertools import chain
 
 import pygame
 
-from ..assets import get_sprite, pixeled
-from ..constants import (BG_SCROOL_SPEED, BLACK, BLUE,
-                         ENEMI_SHIP_SPAWN_INTERVAL, FONT_SIZE,
-                         POWERUP_SPAWN_EVENT, POWERUP_SPAWN_INTERVAL,
-                         SHIP_HEALTH, SHIP_SPAWN_EVENT, WHITE)
+from ..background import BACKGROUNDS
+from ..base import InterpolatedGroup
+from ..entities import EntityGroup, EntityStore, np
+from ..constants import (BLACK, BLUE,
+                         COLLISION_CELL_SIZE, DIRTY_RECTS_MAX_COVERAGE,
+                         ENEMI_SHIP_SPAWN_INTERVAL, ENTITY_STORE, POWERUP_SPAWN_INTERVAL, SHIP_HEALTH,
+                         WHITE)
+from ..pool import SpritePool
+from ..render import ENEMI_SHIPS, HUD, LASERS, PLAYER, POWERUPS, RenderQueue
 from ..powerups import HealthBoost
-from ..ships import EnemiShip, HeavyEnemiShip, RamShip
+from ..scheduler import Scheduler
+from ..spatial import SpatialHash
+from ..text import get_text
+from ..waves import Wave
 from .base import BaseScene
 
 log = logging.getLogger(__name__)
@@ -25,16 +29,22 @@ class GameScene(BaseScene):
 
 
 class MainScene(GameScene):
-    def __init__(self, game):
+    def __init__(self, game, waves=None):
         super().__init__(game)
 
         # shortcuts
         self.ship = game.ship
+        self.player = InterpolatedGroup(self.ship)
 
         # background
-        self.bg_img = get_sprite("background")
-        self.bg_rect = self.bg_img.get_rect(topleft=(0, 0))
-        self.bg_img_y_pos = 0.0
+        self.background = BACKGROUNDS[game.background](game)
+
+        # rendering
+        self.dirty_rects = game.dirty_rects
+        self.to_update = []  # regions drawn during this frame
+        self.last_update = []  # and during the last one, to be cleared
+        self.full_update = True
+        self.render_queue = RenderQueue(self.screen)
 
         # status text
         self.status_text_bg = pygame.Surface((
@@ -43,9 +53,12 @@ class MainScene(GameScene):
         ))
 
         # sprites
-        self.lasers = pygame.sprite.Group()
-        self.enemi_ships = pygame.sprite.Group()
-        self.powerups = pygame.sprite.Group()
+        self.pool = SpritePool(game, self)
+        self.entities = EntityStore(game) if ENTITY_STORE and np is not None else None
+
+        self.lasers = EntityGroup(self.entities)
+        self.enemi_ships = EntityGroup(self.entities, store_only=True)
+        self.powerups = InterpolatedGroup()
 
         self.objects = [  # TODO: change to custom class for ex ?
             self.lasers,
@@ -53,115 +66,68 @@ class MainScene(GameScene):
             self.powerups
         ]
 
+        # collisions
+        self.enemi_grid = SpatialHash(round(COLLISION_CELL_SIZE * game.scale))
+
         # wave managing
-        self.wave_count = 1
-        self.wave_data = self.get_wave_data()
-        self.current_wave_queue = queue.Queue()
-        self.create_wave(self.wave_data[1])
+        self.waves = waves or game.waves
+        self.wave = Wave(1, self.waves.get(1))
 
         # scene action init
+        self.scheduler = Scheduler()
+
         self.spawn_enemi_ships(5)
-        pygame.time.set_timer(SHIP_SPAWN_EVENT, ENEMI_SHIP_SPAWN_INTERVAL)
-        pygame.time.set_timer(POWERUP_SPAWN_EVENT, POWERUP_SPAWN_INTERVAL)
+        self.scheduler.schedule(ENEMI_SHIP_SPAWN_INTERVAL, self.spawn_random_enemi_ships, repeat=True)
+        self.scheduler.schedule(POWERUP_SPAWN_INTERVAL, self.spawn_powerup, repeat=True)
 
     def cleanup(self):
+        self.player.empty()
         for obj in self.objects:
             obj.empty()
+        self.pool.clear()
         self._get_status_box.cache_clear()
-        self._get_fps_text.cache_clear()
-        pygame.time.set_timer(SHIP_SPAWN_EVENT, 0)  # disable the timer
+        self.scheduler.clear()
 
     def process_event(self, event):
-        if event.type == SHIP_SPAWN_EVENT:
-            self.spawn_enemi_ships(random.randint(2, 4))
-
-        elif event.type == POWERUP_SPAWN_EVENT:
-            # for now, the health boost is the only powerup,
-            # so its normal that everything is centered around
-            # it, for now
-            if self.ship.health <= 10:
-                self.powerups.add(HealthBoost(
-                    self.game, self, (
-                        random.randrange(self.game.screen_width), 0)
-                ))
-
         self.ship.process_event(event)
 
-    def get_wave_data(self):
-        waves = {  # TODO: probably move to own file or something similar
-            1: (
-                lambda score: (score ** 2) / 80 + 5,  # cap func
-                ((EnemiShip, 20),)  # ship type, count
-            ),
-            2: (
-                lambda score: ((score - 20) ** 2) / 80 + 10,
-                ((EnemiShip, 15), (HeavyEnemiShip, 10)),
-            ),
-            3: (
-                lambda score: ((score - 30) ** 2) / 80 + 10,
-                ((EnemiShip, 10), (HeavyEnemiShip, 15), (RamShip, 5)),
-            ),
-            4: (
-                lambda score: (score * 0.5) / 3,
-                ((EnemiShip, 15), (HeavyEnemiShip, 15), (RamShip, 10)),
-            ),
-            5: (
-                lambda score: math.cos(score) * 6 + 15,
-                ((EnemiShip, 30), (HeavyEnemiShip, 25),)
-            ),
-            6: (
-                lambda score: 5,
-                ((RamShip, 15),)
-            ),
-            7: (
-                lambda score: math.cos(score) * 10 + 20,
-                ((EnemiShip, 5), (HeavyEnemiShip, 30),)
-            ),
-            "final": (  # this wave is purposely imposible (for now ofc)
-                lambda score: 100,
-                ((EnemiShip, 500), (HeavyEnemiShip, 500))
-            )
-        }
-        return waves.get(self.wave_count, waves["final"])
-
-    def create_wave(self, ships):
-        wave = []
-        for ship_type, count in ships:
-            wave.extend((ship_type for _ in range(count)))
-
-        random.shuffle(wave)
-
-        for ship_type in wave:
-            self.current_wave_queue.put_nowait(ship_type)
+    def spawn_powerup(self):
+        # for now, the health boost is the only powerup,
+        # so its normal that everything is centered around
+        # it, for now
+        if self.ship.health <= 10:
+            self.powerups.add(self.pool.acquire(
+                HealthBoost, (self.game.random.randrange(self.game.screen_width), 0)
+            ))
+
+    @property
+    def wave_count(self):
+        return self.wave.number
+
+    def spawn_random_enemi_ships(self):
+        self.spawn_enemi_ships(self.game.random.randint(2, 4))
 
     def spawn_enemi_ships(self, count):
         # ajust the count according to the current enemy cap
-        cap = self.wave_data[0](self.game.score)
+        cap = self.wave.get_cap(self.game.score)
         ships = len(self.enemi_ships)
         if ships + count > cap:
             count = round(cap - ships)
         if count <= 0:
             return
 
-        # consume items from the queue
-        wave = []
-        is_empty = False
-        try:
-            for _ in range(count):
-                wave.append(self.current_wave_queue.get_nowait())
-        except queue.Empty:
-            is_empty = True
+        # the wave is over once it has less ships left than we want
+        is_empty = count > self.wave.remaining
 
         # spawn the ships
-        for ship_type, ship_count in Counter(wave).items():
+        for ship_type, ship_count in self.wave.take(count, self.game.random).items():
             self.spawn_enemi_ships_type(ship_count, ship_type)
 
-        # if the queue is empty, so lets move to the next wave
+        # so lets move to the next wave
         if is_empty:
-            self.wave_count += 1
-            log.info(f"Moving to wave {self.wave_count}")  # TODO: handle final wave case
-            self.wave_data = self.get_wave_data()
-            self.create_wave(self.wave_data[1])
+            number = self.wave.number + 1
+            self.wave = Wave(number, self.waves.get(number))
+            log.info(f"Moving to wave {number}")  # TODO: handle final wave case
 
     def spawn_enemi_ships_type(self, count, ship_type):
         # define the spawn aera
@@ -179,35 +145,71 @@ class MainScene(GameScene):
 
         # now place the ships
         log.debug(f"Spawning {count} ships of type {ship_type}")
-        for pos in chain.from_iterable([random.sample(possible_positions, c) for c in counts if c]):
-            self.enemi_ships.add(ship_type(self.game, self, pos))
+        for pos in chain.from_iterable([self.game.random.sample(possible_positions, c) for c in counts if c]):
+            self.enemi_ships.add(self.pool.acquire(ship_type, pos))
+
+    def collide_ship(self, sprite):
+        """
+        Is the sprite colliding (pixel perfect) with our ship.
+        """
+        return self.ship.rect.colliderect(sprite.rect) and pygame.sprite.collide_mask(sprite, self.ship)
 
     def update(self):
-        self.ship.update()
+        self.scheduler.advance(self.game.tick_time)
+
+        self.player.save_positions()
+        for obj in self.objects:
+            obj.save_positions()
+
+        self.player.update()
+        if self.entities is not None:
+            self.entities.step(self.game.delta, self.scheduler.time)
+        self.enemi_grid.rebuild(self.enemi_ships)
         for obj in self.objects:
             obj.update()
 
-    def clear_screen(self):
-        self.bg_img_y_pos += BG_SCROOL_SPEED * self.game.delta
-        if self.bg_img_y_pos >= self.game.screen_height:
-            self.bg_img_y_pos = self.game.screen_height - self.bg_img.get_height()
+        if not self.dirty_rects:  # a scrolling background would make everything dirty
+            self.background.update()
 
-        self.bg_rect.y = self.bg_img_y_pos
+    def invalidate(self):
+        self.full_update = True
 
-        if self.bg_rect.y > 0:
-            self.game.screen.blit(self.bg_img, (0, self.bg_rect.y - self.game.screen_height))
+    def clear_screen(self):
+        if self.dirty_rects and not self.full_update:
+            # with lots of overlapping sprites, redrawing everything is faster
+            coverage = sum(rect.w * rect.h for rect in self.last_update) / self.screen_rect.w / self.screen_rect.h
+            self.full_update = coverage > DIRTY_RECTS_MAX_COVERAGE
 
-        # sub = self.bg_img.subsurface((0, 0), self.screen_size)  TODO: subsurface?
-        self.game.screen.blit(self.bg_img, self.bg_rect)
+        if self.dirty_rects and not self.full_update:
+            self.background.restore(self.screen, self.last_update)
+        else:
+            self.background.draw(self.screen)
 
     def draw(self):
-        self.ship.draw(self.screen)
-        for obj in self.objects:
-            obj.draw(self.screen)
+        alpha = self.game.alpha
+        queue = self.render_queue
+        self.player.queue(queue, PLAYER, alpha)
+        self.lasers.queue(queue, LASERS, alpha)
+        self.enemi_ships.queue(queue, ENEMI_SHIPS, alpha)
+        self.powerups.queue(queue, POWERUPS, alpha)
 
         self.draw_status_box()
         self.display_fps()
 
+        rects = queue.flush(self.dirty_rects)  # the rects are only needed with dirty rects
+        if rects:
+            self.to_update.extend(rects)
+
+    def update_screen(self):
+        if self.dirty_rects and not self.full_update:
+            self.game.present(self.last_update + self.to_update)
+        else:
+            self.game.present()
+            self.full_update = False
+
+        self.last_update = self.to_update
+        self.to_update = []
+
     @functools.lru_cache(1)  # TODO: change probably ?
     def _get_status_box(self, score, health):
         bg = self.status_text_bg
@@ -217,12 +219,10 @@ class MainScene(GameScene):
         width = bg.get_width()
         height = bg.get_height()
         centerx = width / 2
-        font = pixeled(FONT_SIZE)
-
-        score = font.render(f"Score: {score}", False, BLACK)
+        score = get_text(f"Score: {score}", self.game.font_size, BLACK, antialias=False)
         score_rect = score.get_rect(center=(centerx, round(height / 4)))
 
-        health_txt = font.render(f"Health: {health}", False, BLACK)
+        health_txt = get_text(f"Health: {health}", self.game.font_size, BLACK, antialias=False)
         health_rect = health_txt.get_rect(center=(centerx, round(height / 4 * 2.5)))
 
         bg.blits(((score, score_rect), (health_txt, health_rect)))
@@ -240,17 +240,11 @@ class MainScene(GameScene):
     def draw_status_box(self):
         bg = self._get_status_box(self.game.score, self.ship.health)
 
-        self.game.screen.blit(bg, (
+        self.render_queue.add(bg, (
             self.game.screen_width - bg.get_width(),
             self.game.screen_height - bg.get_height()
-        ))
-
-    @functools.lru_cache(4)
-    def _get_fps_text(self, fps):
-        font = pixeled(round(FONT_SIZE / 2))
-        fps_text = font.render(f"FPS: {round(fps)}", True, WHITE)
-        return fps_text
+        ), HUD)
 
     def display_fps(self):
-        fps_text = self._get_fps_text(round(self.game.clock.get_fps()))
-        self.game.screen.blit(fps_text, (0, 0))
+        fps_text = get_text(f"FPS: {round(self.game.clock.get_fps())}", self.game.font_size / 2)
+        self.render_queue.add(fps_text, (0, 0), HUD)
@@ -0,0 +1,53 @@
+import heapq
+import itertools
+
+
+class Timer:
+    __slots__ = ("callback", "interval", "cancelled")
+
+    def __init__(self, callback, interval):
+        self.callback = callback
+        self.interval = interval  # None if the timer doesn't repeat
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Scheduler:
+    """
+    Runs callbacks at given times of a simulation clock, which only moves when advanced,
+    so the timers stop when the game is paused and follow it when it is sped up.
+    """
+    def __init__(self):
+        self.time = 0.0
+        self.queue = []  # (due time, order, timer)
+        self.order = itertools.count()  # keeps the order of timers due at the same time
+
+    def _push(self, when, timer):
+        heapq.heappush(self.queue, (when, next(self.order), timer))
+
+    def schedule(self, delay, callback, repeat=False):
+        """
+        Runs the callback in delay seconds, and then every delay seconds if repeat is True.
+        Returns a timer that can be cancelled.
+        """
+        timer = Timer(callback, delay if repeat else None)
+        self._push(self.time + delay, timer)
+        return timer
+
+    def advance(self, delta):
+        self.time += delta
+
+        queue = self.queue
+        while queue and queue[0][0] <= self.time:
+            when, _, timer = heapq.heappop(queue)
+            if timer.cancelled:
+                continue
+
+            if timer.interval is not None:
+                self._push(when + timer.interval, timer)
+            timer.callback()
+
+    def clear(self):
+        self.queue.clear()
@@ -1,9 +1,8 @@
 import pygame
 
-from ..assets import get_sprite
+from ..assets import get_healed
 from ..constants import (DEATH_EVENT, LEFT_MOVEMENT_KEYS, RIGHT_MOVEMENT_KEYS,
                          SHIP_HEALTH, SHIP_SPEED, SHOOT_KEY)
-from ..filters import get_healed
 from ..lasers import AutoLaser, BasicLaser
 from ..utils import clamp
 from ..weapons import BasicShooter
@@ -11,18 +10,21 @@ from .base import BaseEnemiShip, BaseFireingShip, BaseRamingship, BaseShip
 
 
 class Ship(BaseShip):  # TODO: cleanup this class like the others
+    image_name = "ship"
+    sprite_variants = (("damaged",), ("healed",))
+
     def __init__(self, game):
-        sprite = get_sprite("ships", "ship")
+        sprite = self.sprite.get()
         super().__init__(game, sprite)
         self.healed_img = get_healed(sprite)
 
-        self.speed = SHIP_SPEED
+        self.speed = SHIP_SPEED * game.scale
 
-        self.rect = self.image.get_rect(center=[
+        self.rect = self.image.get_rect()
+        self.place(center=(
             self.game.screen_width / 2,
             self.game.screen_height / 1.11
-        ])
-        self.mask = pygame.mask.from_surface(self.image)
+        ))
 
         self.weapon = BasicShooter(self, "midtop")
 
@@ -30,7 +32,7 @@ class Ship(BaseShip):  # TODO: cleanup this class like the others
 
     def heal(self, amount):
         self.image = self.healed_img
-        self.last_hit_time = self.game.loop_time
+        self.last_hit_time = self.game.sim_time
 
         new = self.health + amount
         self.health = clamp(0, SHIP_HEALTH, new)
@@ -53,15 +55,12 @@ class Ship(BaseShip):  # TODO: cleanup this class like the others
 
         # lets try moving the ship according to input
         if any([self.game.pressed_keys[key] for key in LEFT_MOVEMENT_KEYS]):
-            if not self.rect.topleft[0] < 0:
-                self.rect.x -= self.speed * self.game.delta
+            if not self.x < 0:
+                self.x -= self.speed * self.game.delta
 
         elif any([self.game.pressed_keys[key] for key in RIGHT_MOVEMENT_KEYS]):
-            if not self.rect.topright[0] > self.game.screen_width:
-                self.rect.x += self.speed * self.game.delta
-
-    def draw(self, surface):
-        surface.blit(self.image, self.rect)
+            if not self.x + self.rect.width > self.game.screen_width:
+                self.x += self.speed * self.game.delta
 
 
 class EnemiShip(BaseFireingShip, BaseEnemiShip):
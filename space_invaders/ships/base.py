@@ -1,19 +1,17 @@
-from random import randint
-
-import pygame
-
-from ..assets import get_sprite
-from ..base import BaseSprite
+from ..assets import get_damaged, get_mask, get_rotated
+from ..base import BaseSprite, PooledSprite
 from ..constants import (BASE_SCREEN_SIZE, DEFAULT_ENEMI_SHIP_HEALTH,
                          DEFAULT_ENEMI_SHIP_SPEED, DAMAGED_EFFECT_STAY_TIME)
-from ..filters import get_damaged, get_rotated
 
 
 class BaseShip(BaseSprite):
+    sprite_dir = "ships"
+
     def __init__(self, game, image):
         super().__init__(game)
 
         self.normal_img = self.image = image
+        self.mask = get_mask(image)
         self.damaged_img = get_damaged(image)
 
         self.last_hit_time = 0
@@ -24,48 +22,78 @@ class BaseShip(BaseSprite):
     def on_collision(self, damage):
         self.health -= damage  # pylint: disable=no-member
         self.image = self.damaged_img
-        self.last_hit_time = self.game.loop_time
+        self.last_hit_time = self.game.sim_time
+
+    def restore_image(self):
+        self.image = self.normal_img
 
     def update(self):
         # can we remove the damage effect, if there is any
-        if self.image != self.normal_img and (self.game.loop_time - self.last_hit_time) >= DAMAGED_EFFECT_STAY_TIME:
-            self.image = self.normal_img
+        if self.image != self.normal_img and (self.game.sim_time - self.last_hit_time) >= DAMAGED_EFFECT_STAY_TIME:
+            self.restore_image()
 
 
-class BaseEnemiShip(BaseShip):
+class BaseEnemiShip(BaseShip, PooledSprite):
+    sprite_variants = (("rotated+180",), ("rotated+180", "damaged"))
+
     def __init__(self, game, scene, original_x_position):
         super().__init__(
             game,
-            get_rotated(get_sprite("ships", self.image_name), 180)
+            get_rotated(self.sprite.get(), 180)
         )
         self.scene = scene
 
-        self.rect = self.image.get_rect(midbottom=(original_x_position, 0))
+        self.rect = self.image.get_rect()
+        self.place(midbottom=(original_x_position, 0))
 
-        self.direction = randint(0, 1)
+        self.direction = self.game.random.randint(0, 1)
 
         # default values
         self.set_default("health", DEFAULT_ENEMI_SHIP_HEALTH)
         self.set_default("speed", DEFAULT_ENEMI_SHIP_SPEED)
+        self.max_health = self.health
 
         self.awarded_points = 1
 
+    def reset(self, original_x_position):
+        self.image = self.normal_img
+        self.last_hit_time = 0
+
+        self.place(midbottom=(original_x_position, 0))
+
+        self.direction = self.game.random.randint(0, 1)
+        self.health = self.max_health
+
+    @property
+    def velocity(self):
+        speed = self.speed * self.game.screen_width / BASE_SCREEN_SIZE[0]
+        return (speed if self.direction else -speed), 0
+
+    def add_entity(self, store):
+        self.slot = store.add(self, *self.velocity, bounces=True)
+
     def move(self):
         if self.direction == 0:  # left
-            self.rect.x -= (self.speed * self.game.screen_width / BASE_SCREEN_SIZE[0]) * self.game.delta
+            self.x -= (self.speed * self.game.screen_width / BASE_SCREEN_SIZE[0]) * self.game.delta
 
         elif self.direction == 1:  # right
-            self.rect.x += (self.speed * self.game.screen_width / BASE_SCREEN_SIZE[0]) * self.game.delta
+            self.x += (self.speed * self.game.screen_width / BASE_SCREEN_SIZE[0]) * self.game.delta
 
     def turn(self):
         # has the sprite reached the border? if so, reverse time
-        if (self.rect.topleft[0] < 0) or (self.rect.topright[0] > self.game.screen_width):
+        if (self.x < 0) or (self.x + self.rect.width > self.game.screen_width):
             self.direction = int(not self.direction)
+            self.on_turn()
             return True
         return False
 
+    def on_turn(self):
+        pass
+
     def on_collision(self, damage):
         super().on_collision(damage)
+        if self.slot is not None:
+            self.scene.entities.hit(self.slot)
 
         if self.health <= 0:  # pylint: disable=no-member
             self.game.score += self.awarded_points
@@ -82,11 +110,35 @@ class BaseEnemiShip(BaseShip):
 
 
 class BaseFireingShip(BaseEnemiShip):
+    spawn_speed = 1
+
     def __init__(self, game, scene, pos):
         super().__init__(game, scene, pos)
 
-        self.last_shoot_time = self.game.loop_time
-        self.set_default("shoot_interval", randint(8, 12) / 10)
+        self.fire_timer = None  # started once the ship is fully spawned
+        self.set_default("shoot_interval", self.game.random.randint(8, 12) / 10)
+
+    def reset(self, pos):
+        super().reset(pos)
+        self.fire_timer = None
+
+    def kill(self):
+        if self.fire_timer:
+            self.fire_timer.cancel()
+            self.fire_timer = None
+        super().kill()
+
+    @property
+    def spawn_line(self):
+        # the ship is fully spawned once its center crosses this line
+        return self.game.screen_height / 11.25
+
+    def add_entity(self, store):
+        vx, _ = self.velocity
+        self.slot = store.add(
+            self, vx, self.spawn_speed, bounces=True,
+            spawn_line=self.spawn_line, shoot_interval=self.shoot_interval
+        )
 
     def fire(self):
         self.scene.lasers.add(self.laser_type.create(self.game, self.scene, self.rect.midbottom, True))
@@ -94,42 +146,65 @@ class BaseFireingShip(BaseEnemiShip):
     def update(self):
         super().update()
 
+        if self.fire_timer:
+            return
+
         # is the ship fully spawned? if not, move it down and don't shoot
-        if self.rect.centery <= self.game.screen_height / 11.25:
-            self.rect.y += 1 * self.game.delta
+        if self.y + self.rect.height / 2 <= self.spawn_line:
+            self.y += self.spawn_speed * self.game.delta
             return
 
-        # should it shoot
-        if (self.game.loop_time - self.last_shoot_time) > self.shoot_interval:
-            self.fire()
-            self.last_shoot_time = self.game.loop_time
+        # it is, so it can start shooting
+        self.fire_timer = self.scene.scheduler.schedule(self.shoot_interval, self.fire, repeat=True)
 
 
 class BaseRamingship(BaseEnemiShip):
+    sprite_variants = BaseEnemiShip.sprite_variants + (("rotated+180", "rotated-90"), ("rotated+180", "rotated+90"))
+
     def __init__(self, game, scene, pos):
         super().__init__(game, scene, pos)
         self.imgs = [
             get_rotated(self.image, -90),
             get_rotated(self.image, 90)
         ]
+        self.set_image()
+
+    def set_image(self):
         self.image = self.imgs[self.direction]
+        self.mask = get_mask(self.image)
 
-    def turn(self):
-        if super().turn():
-            self.image = self.imgs[self.direction]
+    def restore_image(self):
+        self.set_image()
+
+    def reset(self, pos):
+        super().reset(pos)
+        self.set_image()
+
+    @property
+    def velocity(self):
+        vx, _ = super().velocity
+        return vx, self.y_speed
+
+    def add_entity(self, store):
+        self.slot = store.add(self, *self.velocity, bounces=True, culled=True, rams=True)
+
+    def on_turn(self):
+        self.set_image()
+
+    def ram(self):
+        # damage the ship when we collid with them
+        if self.scene.collide_ship(self):
+            self.game.ship.on_collision(self.damage)
+            self.kill()
 
     def update(self):
         super().update()
 
         # and down goes the ship
-        self.rect.y += self.y_speed * self.game.delta
+        self.y += self.y_speed * self.game.delta
 
         # has it gone out of the screen ?
-        if self.rect.y > self.game.screen_height:
+        if self.y > self.game.screen_height:
             self.kill()
 
-        # damage the ship when we collid with them
-        collision = pygame.sprite.spritecollide(self, [self.game.ship], False)
-        if pygame.sprite.spritecollideany(self, collision, pygame.sprite.collide_mask):
-            self.game.ship.on_collision(self.damage)
-            self.kill()
+        self.ram()
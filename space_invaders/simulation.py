@@ -0,0 +1,230 @@
+"""
+Plays many headless games in parallel, with a pilot instead of a player, to balance the waves.
+Run it with `python tools.py simulate`, see --help for the parameters to sweep.
+"""
+import argparse
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import pygame
+
+from .constants import LEFT_MOVEMENT_KEYS, RIGHT_MOVEMENT_KEYS, SHOOT_KEY
+from .scenes import DeathScene
+from .ships.base import BaseRamingship
+
+SIMULATED_MINUTES = 10  # the games last at most this long
+PILOT_SHOOT_INTERVAL = 12  # ticks between the dodging pilot's shots, about 5 per second
+
+
+class BasePilot:
+    """
+    Plays in place of the player, by sending the events of the keys it presses.
+    """
+    def __init__(self, rng):
+        self.rng = rng
+        self.direction = 0  # -1 for left, 1 for right
+        self.tick = 0
+
+    def decide(self, game):
+        """
+        Returns the direction to move to and if it should shoot during this tick.
+        """
+        return 0, False
+
+    def get_events(self, game):
+        direction, shoot = self.decide(game)
+        self.tick += 1
+
+        events = []
+        if direction != self.direction:
+            keys = {-1: LEFT_MOVEMENT_KEYS[0], 1: RIGHT_MOVEMENT_KEYS[0]}
+            if self.direction:
+                events.append(pygame.event.Event(pygame.KEYUP, key=keys[self.direction]))
+            if direction:
+                events.append(pygame.event.Event(pygame.KEYDOWN, key=keys[direction]))
+            self.direction = direction
+
+        if shoot:
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=SHOOT_KEY))
+            events.append(pygame.event.Event(pygame.KEYUP, key=SHOOT_KEY))
+        return events
+
+
+class RandomPilot(BasePilot):
+    def decide(self, game):
+        direction = self.direction
+        if self.rng.random() < 0.05:
+            direction = self.rng.choice((-1, 0, 1))
+        return direction, self.rng.random() < 0.1
+
+
+class DodgingPilot(BasePilot):
+    """
+    Moves away from what is about to hit the ship, and otherwise under the closest enemi ship, shooting all the time.
+    """
+    def decide(self, game):
+        ship = game.ship.rect
+        scene = game.scene
+        shoot = self.tick % PILOT_SHOOT_INTERVAL == 0
+
+        # the enemi lasers going down and ram ships above us, close enough to be a danger
+        danger = ship.inflate(ship.width, 0)
+        danger.height = game.screen_height / 3
+        danger.bottom = ship.bottom
+        threats = [laser.rect for laser in scene.lasers if laser.velocity[1] > 0 and danger.colliderect(laser.rect)]
+        threats.extend(
+            enemi.rect for enemi in scene.enemi_ships
+            if isinstance(enemi, BaseRamingship) and danger.colliderect(enemi.rect)
+        )
+        if threats:
+            threat_x = sum(threat.centerx for threat in threats) / len(threats)
+            direction = -1 if threat_x >= ship.centerx else 1
+            if (direction == -1 and ship.left <= 0) or (direction == 1 and ship.right >= game.screen_width):
+                direction = -direction
+            return direction, shoot
+
+        if not scene.enemi_ships:
+            return 0, shoot
+        target = min(scene.enemi_ships, key=lambda enemi: abs(enemi.rect.centerx - ship.centerx)).rect
+        if abs(target.centerx - ship.centerx) <= game.ship.speed * game.delta:
+            return 0, shoot
+        return (1 if target.centerx > ship.centerx else -1), shoot
+
+
+PILOTS = {"random": RandomPilot, "dodging": DodgingPilot}
+
+
+_game = None  # every worker process plays its games one after the other in the same game
+
+
+def _init_worker():
+    global _game
+    from . import setup_headless
+    from .game import Game
+
+    setup_headless()
+    pygame.init()
+    _game = Game()
+
+
+def play(job):
+    """
+    Plays a game, returns how it went, globally and for each wave.
+    """
+    seed, pilot_name, cap_scale, count_scale, minutes = job
+    game = _game
+    max_ticks = round(minutes * 60 * game.tick_rate)
+
+    pygame.event.clear()
+    game.pressed_keys.clear()
+    game.random.seed(seed)
+    game.start_new_game(game.waves.scaled(cap_scale, count_scale))
+    scene = game.scene
+    pilot = PILOTS[pilot_name](random.Random(seed))
+
+    waves = defaultdict(lambda: {"ticks": 0, "score": 0, "peak_ships": 0, "peak_lasers": 0})
+    died = False
+    tick = 0
+    for tick in range(1, max_ticks + 1):
+        for event in pilot.get_events(game):
+            pygame.event.post(event)
+        game.step()
+        if isinstance(game.scene, DeathScene):
+            died = True
+            break
+
+        wave = waves[scene.wave_count]
+        wave["ticks"] += 1
+        wave["score"] = game.score
+        wave["peak_ships"] = max(wave["peak_ships"], len(scene.enemi_ships))
+        wave["peak_lasers"] = max(wave["peak_lasers"], len(scene.lasers))
+
+    for wave in waves.values():
+        wave["seconds"] = wave["ticks"] / game.tick_rate
+
+    scene.cleanup()
+    return {
+        "seed": seed, "pilot": pilot_name, "cap_scale": cap_scale, "count_scale": count_scale,
+        "seconds": tick / game.tick_rate, "score": game.score, "died": died,
+        "last_wave": scene.wave_count, "waves": dict(waves)
+    }
+
+
+def run(jobs, workers=None):
+    with ProcessPoolExecutor(workers, initializer=_init_worker) as executor:
+        return list(executor.map(play, jobs, chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count())))))
+
+
+def aggregate(results):
+    """
+    Returns a row per (pilot, cap scale, count scale, wave) with the means over the games that reached the wave.
+    """
+    groups = defaultdict(list)
+    for result in results:
+        groups[result["pilot"], result["cap_scale"], result["count_scale"]].append(result)
+
+    rows = []
+    for (pilot, cap_scale, count_scale), games in sorted(groups.items()):
+        for wave in sorted({wave for game in games for wave in game["waves"]}):
+            reached = [game for game in games if wave in game["waves"]]
+            stats = [game["waves"][wave] for game in reached]
+            died = sum(game["died"] and game["last_wave"] == wave for game in reached)
+            rows.append({
+                "pilot": pilot, "cap": cap_scale, "count": count_scale, "wave": wave,
+                "games": len(reached), "deaths": died / len(reached),
+                "seconds": sum(s["seconds"] for s in stats) / len(stats),
+                "score": sum(s["score"] for s in stats) / len(stats),
+                "peak ships": max(s["peak_ships"] for s in stats),
+                "peak lasers": max(s["peak_lasers"] for s in stats)
+            })
+    return rows
+
+
+def print_table(rows):
+    columns = ("pilot", "cap", "count", "wave", "games", "deaths", "seconds", "score", "peak ships", "peak lasers")
+    print("".join(f"{column:>12}" for column in columns))
+    for row in rows:
+        print("".join(
+            f"{row[column]:>12.1%}" if column == "deaths" else
+            f"{row[column]:>12.1f}" if isinstance(row[column], float) else f"{row[column]:>12}"
+            for column in columns
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser("simulate", description=__doc__)
+    parser.add_argument("--games", type=int, default=100, help="Games per combination of the parameters.")
+    parser.add_argument("--pilots", nargs="+", choices=PILOTS, default=["dodging"])
+    parser.add_argument("--cap-scales", nargs="+", type=float, default=[1.0],
+                        help="Multipliers of the enemi caps of the waves.")
+    parser.add_argument("--count-scales", nargs="+", type=float, default=[1.0],
+                        help="Multipliers of the number of ships in the waves.")
+    parser.add_argument("--minutes", type=float, default=SIMULATED_MINUTES, help="Longest simulated game.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game, the others follow.")
+    parser.add_argument("--workers", type=int, default=None, help="Processes to use, all the cores by default.")
+    parser.add_argument("--json", metavar="PATH", help="Also write the result of every game to this file.")
+    args = parser.parse_args()
+
+    jobs = [
+        (args.seed + i, pilot, cap_scale, count_scale, args.minutes)
+        for pilot, cap_scale, count_scale in product(args.pilots, args.cap_scales, args.count_scales)
+        for i in range(args.games)
+    ]
+
+    start = time.perf_counter()
+    results = run(jobs, args.workers)
+    print(f"Played {len(results)} games in {time.perf_counter() - start:.1f} s")
+    print_table(aggregate(results))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f)
+
+
+if __name__ == "__main__":
+    main()
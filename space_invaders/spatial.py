@@ -0,0 +1,52 @@
+from collections import defaultdict
+
+
+class SpatialHash:
+    """
+    A uniform grid of sprites, used as a broad-phase for the collisions.
+    It is rebuilt every tick (only once it is queried), sprites killed since then are skipped.
+    """
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self.sprites = None  # sprites to put in the grid on the next query
+
+    def _get_cells(self, rect):
+        size = self.cell_size
+        for x in range(rect.left // size, rect.right // size + 1):
+            for y in range(rect.top // size, rect.bottom // size + 1):
+                yield x, y
+
+    def rebuild(self, sprites):
+        self.sprites = sprites
+
+    def _build(self):
+        size = self.cell_size
+        cells = self.cells
+        cells.clear()
+        for sprite in self.sprites:
+            rect = sprite.rect
+            left, right = rect.left // size, rect.right // size + 1
+            for y in range(rect.top // size, rect.bottom // size + 1):
+                for x in range(left, right):
+                    cells[x, y].append(sprite)
+
+        self.sprites = None
+
+    def query(self, rect):
+        if self.sprites is not None:
+            self._build()
+
+        # a dict keeps the order of the sprites, unlike a set
+        found = {}
+        for cell in self._get_cells(rect):
+            if cell in self.cells:
+                found.update(dict.fromkeys(self.cells[cell]))
+        return found.keys()
+
+    def collide(self, sprite):
+        """
+        Returns the sprites whose rect collides with the sprite's rect.
+        """
+        rect = sprite.rect
+        return [s for s in self.query(rect) if s.alive() and rect.colliderect(s.rect)]
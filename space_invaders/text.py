@@ -0,0 +1,112 @@
+import logging
+from collections import OrderedDict
+
+import pygame
+
+from .assets import pixeled
+from .constants import (TEXT_CACHE_BUDGET, TEXT_OPACITY_STEP, TEXT_SCALE_STEP,
+                        WHITE)
+from .utils import clamp
+
+log = logging.getLogger(__name__)
+
+
+class SurfaceCache:
+    """
+    A least recently used cache of surfaces, bounded by the memory of the surfaces it keeps.
+    """
+    def __init__(self, budget):
+        self.budget = budget
+        self.surfaces = OrderedDict()
+        self.size = 0  # in bytes
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, render):
+        """
+        Returns the surface of a key, render is called to create it if it isn't cached.
+        """
+        try:
+            surf = self.surfaces[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surf
+
+        self.misses += 1
+        surf = self.surfaces[key] = render()
+        self.size += _get_size(surf)
+
+        while self.size > self.budget and len(self.surfaces) > 1:
+            _, old = self.surfaces.popitem(last=False)
+            self.size -= _get_size(old)
+
+        return surf
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "surfaces": len(self.surfaces), "size": self.size}
+
+    def clear(self):
+        log.debug(f"Text cache stats: {self.stats()}")
+        self.surfaces.clear()
+        self.size = 0
+
+
+def _get_size(surf):
+    return surf.get_width() * surf.get_height() * surf.get_bytesize()
+
+
+_cache = SurfaceCache(TEXT_CACHE_BUDGET)
+
+
+def get_surface(key, render):
+    """
+    Returns a cached surface, for things other than text that are drawn often, like buttons.
+    """
+    return _cache.get(key, render)
+
+
+def get_text(text, size, color=WHITE, opacity=255, antialias=True, scale=100):
+    """
+    Returns rendered text, the opacity and the scale (in percents) are rounded
+    to their steps, so that animated text only goes through a few frames.
+    """
+    size = round(size)
+    color = tuple(color)
+    opacity = clamp(0, 255, round(opacity / TEXT_OPACITY_STEP) * TEXT_OPACITY_STEP)
+    scale = round(scale / TEXT_SCALE_STEP) * TEXT_SCALE_STEP
+
+    key = (text, size, color, antialias, opacity, scale)
+    return _cache.get(key, lambda: _render(text, size, color, antialias, opacity, scale))
+
+
+def _render(text, size, color, antialias, opacity, scale):
+    if opacity != 255:
+        surf = get_text(text, size, color, 255, antialias, scale).copy()
+        surf.set_alpha(opacity)
+        return surf
+
+    if scale != 100:
+        surf = get_text(text, size, color, 255, antialias)
+        return pygame.transform.smoothscale(surf, (
+            round(surf.get_width() * scale / 100),
+            round(surf.get_height() * scale / 100)
+        ))
+
+    return pixeled(size).render(text, antialias, color)
+
+
+def prerender(text, size, opacities=(255,), scales=(100,), **kwargs):
+    """
+    Renders the frames of animated text ahead of time, the kwargs are passed to get_text.
+    """
+    for scale in scales:
+        for opacity in opacities:
+            get_text(text, size, opacity=opacity, scale=scale, **kwargs)
+
+
+def clear():
+    _cache.clear()
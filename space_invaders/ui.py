@@ -1,9 +1,8 @@
-import functools
-
 import pygame
 
 from .assets import pixeled
 from .constants import WHITE
+from .text import get_surface
 
 
 class BaseUIElement:
@@ -32,8 +31,10 @@ class Button(BaseUIElement):
 
         self.is_highlighted = False
 
-    @functools.lru_cache(2)
     def _get_surf(self, highlited):
+        return get_surface(("button", self.text, self.rect.size, highlited), lambda: self._render(highlited))
+
+    def _render(self, highlited):
         surf = pygame.Surface(self.rect.size)
 
         if highlited:  # TODO: use color.lerp in pygame 2.0+
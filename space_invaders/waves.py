@@ -0,0 +1,203 @@
+import ast
+import json
+import logging
+import math
+
+from .constants import WAVES_PATH
+from .ships import EnemiShip, HeavyEnemiShip, RamShip
+
+log = logging.getLogger(__name__)
+
+SHIP_TYPES = {ship_type.__name__: ship_type for ship_type in (EnemiShip, HeavyEnemiShip, RamShip)}
+
+# what the cap expressions can use, on top of the score and arithmetic
+CAP_NAMES = {
+    "cos": math.cos, "sin": math.sin, "sqrt": math.sqrt, "log": math.log,
+    "abs": abs, "min": min, "max": max, "pi": math.pi
+}
+CAP_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load, ast.Call,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.USub, ast.UAdd
+)
+CAP_MAX_EXPONENT = 10
+
+
+class WaveError(Exception):
+    pass
+
+
+def compile_cap(expression):
+    """
+    Returns the function of a cap expression, after checking that it is only arithmetic on the score.
+    It computes with floats, use WaveSpec.get_cap to evaluate it.
+    """
+    try:
+        tree = ast.parse(str(expression), mode="eval")
+    except SyntaxError as e:
+        raise WaveError(f"invalid cap {expression!r}: {e.msg}") from None
+
+    for node in ast.walk(tree):
+        if not isinstance(node, CAP_NODES):
+            raise WaveError(f"invalid cap {expression!r}: {type(node).__name__} isn't allowed")
+        if isinstance(node, ast.Name) and node.id != "score" and node.id not in CAP_NAMES:
+            raise WaveError(f"invalid cap {expression!r}: unknown name {node.id}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise WaveError(f"invalid cap {expression!r}: only numbers are allowed")
+        if isinstance(node, ast.Call) and (
+            not isinstance(node.func, ast.Name) or node.func.id not in CAP_NAMES or node.keywords
+        ):
+            raise WaveError(f"invalid cap {expression!r}: only functions can be called, without keywords")
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow) and not (
+            isinstance(node.right, ast.Constant) and isinstance(node.right.value, (int, float))
+            and abs(node.right.value) <= CAP_MAX_EXPONENT
+        ):
+            raise WaveError(f"invalid cap {expression!r}: exponents must be numbers up to {CAP_MAX_EXPONENT}")
+        if isinstance(node, ast.Constant):
+            node.value = float(node.value)  # so that the results overflow instead of growing without bounds
+
+    code = compile(ast.fix_missing_locations(ast.Expression(ast.Lambda(
+        ast.arguments(posonlyargs=[], args=[ast.arg("score")], kwonlyargs=[], kw_defaults=[], defaults=[]),
+        tree.body
+    ))), "<cap>", "eval")
+    return eval(code, {"__builtins__": {}, **CAP_NAMES})  # safe, the expression was checked
+
+
+class WaveSpec:
+    """
+    A wave, as defined: its cap and how many ships of each type it has.
+    """
+    __slots__ = ("expression", "cap", "ships")
+
+    def __init__(self, expression, cap, ships):
+        self.expression = expression
+        self.cap = cap
+        self.ships = ships  # ((ship type, count), ...)
+
+    def get_cap(self, score):
+        """
+        Returns the cap at this score, raises WaveError if the expression can't be evaluated there.
+        """
+        try:
+            cap = float(self.cap(float(score)))
+        except (ArithmeticError, TypeError, ValueError) as e:
+            raise WaveError(f"cap {self.expression!r} at score {score}: {e}") from None
+        if not math.isfinite(cap):
+            raise WaveError(f"cap {self.expression!r} at score {score}: {cap} isn't a number of ships")
+        return cap
+
+    @classmethod
+    def from_data(cls, data):
+        if not isinstance(data, dict) or set(data) != {"cap", "ships"}:
+            raise WaveError("a wave needs a cap and ships, and nothing else")
+        if not isinstance(data["ships"], dict) or not data["ships"]:
+            raise WaveError("the ships of a wave are the count of each ship type")
+
+        ships = []
+        for name, count in data["ships"].items():
+            if name not in SHIP_TYPES:
+                raise WaveError(f"unknown ship type {name}, it can be one of {', '.join(SHIP_TYPES)}")
+            if not isinstance(count, int) or count <= 0:
+                raise WaveError(f"the count of {name} must be a positive integer")
+            ships.append((SHIP_TYPES[name], count))
+
+        spec = cls(data["cap"], compile_cap(data["cap"]), tuple(ships))
+        spec.get_cap(0)  # the game starts there
+        return spec
+
+
+class WavePlan:
+    """
+    All the waves, compiled, after them the final wave repeats forever.
+    """
+    def __init__(self, waves, final):
+        self.waves = waves
+        self.final = final
+
+    def get(self, number):
+        return self.waves[number - 1] if number <= len(self.waves) else self.final
+
+    def scaled(self, cap_scale, count_scale):
+        """
+        Returns the plan with the caps and ship counts multiplied.
+        """
+        def scale(spec):
+            return WaveSpec(
+                f"({spec.expression}) * {cap_scale}",
+                lambda score: spec.cap(score) * cap_scale,
+                tuple((ship_type, max(1, round(count * count_scale))) for ship_type, count in spec.ships)
+            )
+        return WavePlan([scale(spec) for spec in self.waves], scale(self.final))
+
+
+def load_waves(path=WAVES_PATH):
+    """
+    Loads, checks and compiles the waves, raises WaveError if they are invalid.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise WaveError(f"can't load the waves from {path}: {e}") from None
+
+    if not isinstance(data, dict) or not data.get("waves") or "final" not in data:
+        raise WaveError(f"{path} needs a list of waves and a final wave")
+
+    waves = []
+    for i, wave in enumerate(data["waves"], 1):
+        try:
+            waves.append(WaveSpec.from_data(wave))
+        except WaveError as e:
+            raise WaveError(f"wave {i}: {e}") from None
+    try:
+        final = WaveSpec.from_data(data["final"])
+    except WaveError as e:
+        raise WaveError(f"final wave: {e}") from None
+
+    log.debug(f"Loaded {len(waves)} waves")
+    return WavePlan(waves, final)
+
+
+class Wave:
+    """
+    The ships of a wave that are left to spawn, counted by type.
+    """
+    __slots__ = ("number", "spec", "last_cap", "failed", "types", "counts", "remaining")
+
+    def __init__(self, number, spec):
+        self.number = number
+        self.spec = spec
+        self.last_cap = 0
+        self.failed = False
+        self.types = [ship_type for ship_type, _ in spec.ships]
+        self.counts = [count for _, count in spec.ships]
+        self.remaining = sum(self.counts)
+
+    def get_cap(self, score):
+        """
+        Returns the cap at this score, or the last one if it can't be evaluated there.
+        """
+        try:
+            self.last_cap = self.spec.get_cap(score)
+        except WaveError as e:
+            if not self.failed:  # once, it is checked at every spawn
+                log.warning(f"Wave {self.number}: {e}, keeping the cap at {self.last_cap}")
+                self.failed = True
+        return self.last_cap
+
+    def take(self, count, rng):
+        """
+        Takes up to count random ships out of the wave, returns how many of each type.
+        """
+        taken = {}
+        for _ in range(min(count, self.remaining)):
+            # as if the ships of the wave were shuffled
+            pick = rng.randrange(self.remaining)
+            for i, type_count in enumerate(self.counts):
+                if pick < type_count:
+                    break
+                pick -= type_count
+
+            self.counts[i] -= 1
+            self.remaining -= 1
+            taken[self.types[i]] = taken.get(self.types[i], 0) + 1
+        return taken
@@ -24,6 +24,14 @@ if sys.argv[1] == "profile":
     sn_cli.main(["out.prof"])
     os.remove("out.prof")
 
+elif sys.argv[1] == "bench":
+    code = subprocess.run([sys.executable, "-m", "benchmarks.suite", *sys.argv[2:]], cwd=HERE).returncode
+    sys.exit(code)
+
+elif sys.argv[1] == "simulate":
+    code = subprocess.run([sys.executable, "-m", "space_invaders.simulation", *sys.argv[2:]], cwd=HERE).returncode
+    sys.exit(code)
+
 elif sys.argv[1] == "build":
     cmd = (
         "pyinstaller run.py --name spaceinv --noconfirm "
@@ -44,6 +52,7 @@ elif sys.argv[1] == "build":
 elif sys.argv[1] == "clean":
     shutil.rmtree("build", True)
     shutil.rmtree("dist", True)
+    shutil.rmtree(HERE / "space_invaders" / "cache", True)
     os.remove("spaceinv.spec")
     for path in glob.iglob("**/__pycache__", recursive=True):
         shutil.rmtree(path, True)